@@ -1,67 +1,38 @@
-import streamlit as st
 import os
-import json
-import time
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.action_chains import ActionChains
-from webdriver_manager.chrome import ChromeDriverManager
-
-COOKIE_FILE = "twitter_cookies.json"
-
-def configure_chrome_options():
-    options = Options()
-    # Headless REMOVED for visibility and to avoid bot detection
-    # options.add_argument("--headless=new")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option("useAutomationExtension", False)
-    return options
-
-def initialize_driver():
-    options = configure_chrome_options()
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
-
-def load_cookies(driver, cookie_file):
-    with open(cookie_file, "r") as f:
-        cookies = json.load(f)
-    driver.get("https://x.com/")
-    for cookie in cookies:
-        cookie.pop('sameSite', None)
-        if 'expiry' in cookie:
-            cookie['expiry'] = int(cookie['expiry'])
-        try:
-            driver.add_cookie(cookie)
-        except Exception:
-            pass
+from selenium.common.exceptions import StaleElementReferenceException
+
+from archive_planner import read_candidate_ids
+from browser_health import BrowserHealth
+from checkpoint import CHECKPOINT_FILE, DELETED, FAILED, LIKES, CheckpointStore
+from extractor import drain_new_articles, reset_article_queue, resolve_article
+from jobs import render_job_panel, shared_runner
+from like_export import LIKES_EXPORT_FILE, JsonlExport, like_record
+from metrics import METRICS_REPORT, PROMETHEUS_FILE
+from network_confirm import UNFAVORITE_TWEET, confirm_mutation, discard_network_log, last_mutation_response
+from pacing import PacingController
+from progress import LOG_FILE, RunProgress
+from selector_cache import selector_registry
+from session_core import COOKIE_FILE, cached_driver_factory, initialize_driver, start_session
+from waits import scroll_and_wait_for_new_articles, wait_for_element, wait_for_unlike_flip, wait_until
 
-def is_logged_in(driver):
-    driver.get("https://x.com/home")
-    time.sleep(3)
-    return "Home / X" in driver.title or "profile" in driver.page_source.lower()
+SETTLED_STREAK_STOP = 10 # Likes in a row settled in earlier runs before an incremental sweep stops
+
+PROFILE_LINK_SELECTORS = [
+    '//a[@aria-label="Profile"]',
+    '//a[@data-testid="AppTabBar_Profile_Link"]',
+]
 
 def go_to_profile(driver):
-    # Try both common selectors for the profile tab
-    try:
-        profile_link = driver.find_element(By.XPATH, '//a[@aria-label="Profile"]')
-    except:
-        try:
-            profile_link = driver.find_element(By.XPATH, '//a[@data-testid="AppTabBar_Profile_Link"]')
-        except:
-            profile_link = None
+    # Try both common selectors for the profile tab, the one that matched last time first
+    def first_match(selector):
+        links = driver.find_elements(By.XPATH, selector)
+        return links[0] if links else None
+
+    profile_link = selector_registry().find("profile_link", PROFILE_LINK_SELECTORS, first_match)
     if profile_link:
         profile_link.click()
-        time.sleep(3)
+        wait_for_element(driver, '//nav[@aria-label="Profile timelines"]', timeout=10)
         return True
     return False
 
@@ -69,59 +40,184 @@ def go_to_likes_tab(driver):
     try:
         likes_tab = driver.find_element(By.XPATH, '//a[.//span[text()="Likes"]]')
         likes_tab.click()
-        time.sleep(3)
+        wait_until(driver, lambda d: likes_tab.get_attribute("aria-selected") == "true", timeout=10)
         return True
     except Exception as e:
         print("Could not find Likes tab:", e)
         return False
 
-def delete_likes(driver):
+def click_unlike(driver, article):
+    # Scroll and click in a single round trip, no separate hover needed for a JS click
+    click_js = "arguments[0].scrollIntoView({block: 'center'}); arguments[0].click();"
+    try:
+        driver.execute_script(click_js, article["unlike_button"])
+        return article["unlike_button"]
+    except StaleElementReferenceException:
+        # X re-rendered the article since it was drained; re-find it by permalink and retry once
+        fresh = resolve_article(driver, article["href"])
+        if not fresh or not fresh["unlike_button"]:
+            raise
+        driver.execute_script(click_js, fresh["unlike_button"])
+        return fresh["unlike_button"]
+
+def delete_likes(driver, store=None, candidate_ids=None, progress=None, pacer=None, incremental=False, export=None, health=None, dry_run=False):
+    # With export (like_export.JsonlExport), every unliked (or failed) like is appended to it as it goes.
+    # With health (browser_health.BrowserHealth), the Likes tab is reloaded whenever Chrome's memory
+    # runs high; likes already removed are gone from the reloaded tab, and the ones left are skipped.
+    # With dry_run, likes are only counted as matched; nothing is clicked or recorded.
+    # With incremental, the sweep stops at the first long run of likes already unliked in earlier runs.
+    # The Likes tab is ordered by when the like was made, not by status id, so there is no snowflake
+    # watermark here; likes that were unliked drop off the tab, so settled ones only reappear below
+    # the part the last run covered. A like shown with its Unlike button is liked right now whatever
+    # the checkpoint says (liked again, or the unlike didn't stick), so it is always unliked again.
+    progress = progress or RunProgress(log_file=None)
+    pacer = pacer or PacingController()
     # Go to profile first
     if not go_to_profile(driver):
-        st.warning("Could not find profile tab. Make sure you are logged in.")
+        progress.warning("Could not find profile tab. Make sure you are logged in.")
         return 0
     # Click the Likes tab
     if not go_to_likes_tab(driver):
-        st.warning("Could not find Likes tab on profile.")
+        progress.warning("Could not find Likes tab on profile.")
         return 0
+    reset_article_queue(driver) # Start from a clean page-side queue, whatever ran in this tab before
 
-    time.sleep(5)
+    wait_for_element(driver, '//article[@data-testid="tweet"]', timeout=10)
     deleted = 0
+    reappeared = 0 # Likes the checkpoint already has as unliked
+    # With a planned list (archive_planner.py on like.js) only those likes are removed, and the scan
+    # stops once all of them are done
+    planned = remaining_candidates = None
+    if candidate_ids is not None:
+        planned = set(candidate_ids)
+        remaining_candidates = {i for i in planned if not (store and store.is_settled(LIKES, i))}
     scroll_attempts = 0
     max_empty_scrolls = 5  # Stop after 5 scrolls in a row with no new likes found
     empty_scrolls = 0
-    wait = WebDriverWait(driver, 10)
+    settled_in_a_row = 0
+    seen = set() # Status ids handled in this sweep
 
     while empty_scrolls < max_empty_scrolls:
         try:
-            unlike_buttons = wait.until(
-                EC.presence_of_all_elements_located((By.XPATH, '//*[@data-testid="unlike"]'))
-            )
-            st.write(f"Found {len(unlike_buttons)} Unlike buttons on scroll {scroll_attempts+1}")
-            if not unlike_buttons:
+            reason = health.over_limit() if health else None
+            if reason:
+                progress.warning(f"{reason}. Reloading the Likes tab.")
+                with progress.metrics.phase("reload"):
+                    health.reload()
+                if health.exhausted:
+                    progress.warning(f"That was the last of {health.max_reloads} reloads allowed per run; memory is no longer watched.")
+            # One round trip for the articles inserted since the last pass (page-side MutationObserver
+            # queue), so Unlike buttons already handled are never fetched again
+            with progress.metrics.phase("drain"):
+                # Likes left in place (failed, previewed, outside the plan) come back after a reload
+                liked_articles = [a for a in drain_new_articles(driver) if a["unlike_button"] and a["status_id"] not in seen]
+            seen.update(a["status_id"] for a in liked_articles)
+            if health and liked_articles:
+                health.advance() # Another reload is only worth it once the sweep has moved on
+            progress.debug(f"Found {len(liked_articles)} new Unlike buttons on scroll {scroll_attempts+1}")
+            if not liked_articles:
                 empty_scrolls += 1
-                st.write(f"No Unlike buttons found. Empty scrolls: {empty_scrolls}/{max_empty_scrolls}")
+                progress.write(f"No Unlike buttons found. Empty scrolls: {empty_scrolls}/{max_empty_scrolls}")
             else:
                 empty_scrolls = 0  # Reset if we found likes
-                for btn in unlike_buttons:
+                for article in liked_articles:
+                    progress.checkpoint() # Pause/cancel point when running as a background job
+                    progress.count("scanned")
+                    if store and store.is_settled(LIKES, article["status_id"]):
+                        reappeared += 1
+                        settled_in_a_row += 1
+                    else:
+                        settled_in_a_row = 0
+                    if planned is not None and article["status_id"] not in planned:
+                        progress.count("skipped")
+                        continue
+                    progress.count("matched")
+                    if dry_run:
+                        progress.debug(f"Would unlike {article['href']}")
+                        continue
                     try:
-                        ActionChains(driver).move_to_element(btn).perform()
-                        driver.execute_script("arguments[0].click();", btn)
-                        time.sleep(1.5)
+                        pacer.wait(progress)
+                        with progress.metrics.item(), progress.metrics.phase("unlike"):
+                            unlike_button = click_unlike(driver, article)
+                            # The UnfavoriteTweet response is the completion signal (X flips the
+                            # button optimistically); the flip is only the fallback without the network log
+                            confirmed = confirm_mutation(driver, UNFAVORITE_TWEET, article["status_id"], timeout=5)
+                            if confirmed is None:
+                                confirmed = wait_for_unlike_flip(driver, unlike_button, timeout=5)
+                        if pacer.record(confirmed, last_mutation_response(driver), progress) and not confirmed:
+                            # Rate limited: X puts the like back; leave it unsettled so the next run retries it
+                            continue
+                        if not confirmed:
+                            progress.warning("X did not confirm the unlike. Skipping.")
+                            progress.record(FAILED)
+                            if store:
+                                store.record(LIKES, article["status_id"], FAILED)
+                            if export:
+                                export.write(like_record(article, FAILED))
+                            continue
                         deleted += 1
-                        st.write(f"Deleted like #{deleted}")
+                        progress.record(DELETED)
+                        if store:
+                            store.record(LIKES, article["status_id"], DELETED)
+                        if export:
+                            export.write(like_record(article, DELETED))
+                        if remaining_candidates is not None:
+                            remaining_candidates.discard(article["status_id"])
+                        progress.debug(f"Deleted like #{deleted}")
                     except Exception as e:
-                        st.write(f"Failed to click Unlike button: {e}")
+                        progress.error(f"Failed to click Unlike button: {e}")
+                        progress.record(FAILED)
+                        if store:
+                            store.record(LIKES, article["status_id"], FAILED)
+                        if export:
+                            export.write(like_record(article, FAILED))
                         continue
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+            if remaining_candidates is not None and not remaining_candidates:
+                progress.info("Every planned like has been removed. Stopping early.")
+                break
+            if incremental and settled_in_a_row >= SETTLED_STREAK_STOP:
+                progress.info(f"Reached {settled_in_a_row} likes in a row already handled in earlier runs. Stopping early.")
+                break
+            with progress.metrics.phase("scroll"):
+                discard_network_log(driver)
+                scroll_and_wait_for_new_articles(driver, timeout=8)
             scroll_attempts += 1
         except Exception as e:
-            st.warning(f"Error: {e}")
+            progress.error(f"Error: {e}")
             break
+    if reappeared:
+        progress.write(f"Found {reappeared} likes still or again liked that earlier runs had already unliked.")
     return deleted
 
+def run_like_cleanup(driver, candidate_ids=None, progress=None, incremental=False, export_file=LIKES_EXPORT_FILE, dry_run=False):
+    # One whole run (runs in the background job); returns the summary shown when it ends.
+    # export_file=None turns the JSONL export off.
+    progress = progress or RunProgress(log_file=None)
+    progress.metrics.tool = "likes"
+    progress.metrics.attach(driver) # Count WebDriver commands per item for the run report
+    store = CheckpointStore(CHECKPOINT_FILE)
+    export = JsonlExport(export_file) if export_file and not dry_run else None
+    health = BrowserHealth(driver)
+    try:
+        deleted = delete_likes(driver, store, candidate_ids, progress, incremental=incremental, export=export, health=health, dry_run=dry_run)
+        summary = {"Likes deleted": deleted, "Checkpoint verdicts": store.counts(LIKES), "Tab reloads to free browser memory": health.reloads}
+        if export:
+            summary[f"Records appended to {export_file}"] = export.written
+        if dry_run:
+            summary["Likes that would be removed"] = progress.counters()["matched"]
+        return summary
+    finally:
+        if export:
+            export.close()
+        store.close()
+        selector_registry().save()
+        progress.metrics.detach()
+        progress.metrics.write_reports(progress.counters())
+
 def main():
+    # Streamlit is only imported by the UI, so cleanup_cli.py can run the cleanup functions without it
+    import streamlit as st
+
     st.title("X/Twitter Likes Deletion Tool (Delete ALL Likes)")
 
     if not os.path.exists(COOKIE_FILE):
@@ -137,39 +233,46 @@ def main():
         )
         return
 
-    # Initialize session state
-    if "logged_in" not in st.session_state:
-        st.session_state.logged_in = False
-    if "driver" not in st.session_state:
-        st.session_state.driver = None
+    # Driver and job live in the shared runner (see jobs.py), so a run survives reruns and reconnects
+    runner = shared_runner("likes")
 
     # Login block
-    if not st.session_state.logged_in:
+    if runner.driver is None:
+        lean = st.checkbox("Lean mode: small window, no images/video/fonts, no autoplay or animations")
+        headless = st.checkbox("Run headless (fastest, but more likely to be flagged as a bot)", disabled=not lean)
         if st.button("Start Session with Cookies"):
             with st.spinner("Launching browser and loading cookies..."):
-                driver = initialize_driver()
-                load_cookies(driver, COOKIE_FILE)
-                driver.get("https://x.com/home")
-                time.sleep(3)
-                if is_logged_in(driver):
+                driver = initialize_driver(cached_driver_factory(), lean=lean, headless=lean and headless)
+                if start_session(driver, COOKIE_FILE):
                     st.success("Logged in with cookies! 🎉")
-                    st.session_state.logged_in = True
-                    st.session_state.driver = driver
+                    runner.driver = driver
                 else:
                     st.error("Failed to log in with cookies. Cookies may be expired or invalid.")
                     driver.quit()
     # Always show the form if logged in
-    if st.session_state.logged_in and st.session_state.driver:
+    if runner.driver:
         st.success("You are logged in!")
+        if runner.job:
+            render_job_panel(runner)
+            st.caption(f"Full log: {LOG_FILE} · Timing report: {METRICS_REPORT.format(tool='likes')}, {PROMETHEUS_FILE.format(tool='likes')}")
+            if not runner.busy() and st.button("Close browser"):
+                runner.close_driver()
+                st.rerun()
+            return
         with st.form("delete_likes_form"):
+            candidate_file = st.file_uploader(
+                "Optional: like id list from archive_planner.py (only these likes will be removed)", type=["txt"]
+            )
+            incremental = st.checkbox("Incremental: stop at the first long run of likes already handled in earlier runs", value=True)
+            export = st.checkbox(f"Append each removed like to '{LIKES_EXPORT_FILE}' (audit trail / re-like list)", value=True)
+            compress = st.checkbox("Gzip the export")
             submit = st.form_submit_button("Delete ALL Likes")
         if submit:
-            with st.spinner("Deleting all likes..."):
-                deleted = delete_likes(st.session_state.driver)
-                st.success(f"Deleted {deleted} likes!")
-            st.session_state.driver.quit()
-            st.session_state.logged_in = False
-            st.session_state.driver = None
+            driver = runner.driver
+            candidate_ids = read_candidate_ids(candidate_file) if candidate_file else None
+            export_file = (LIKES_EXPORT_FILE + ".gz" if compress else LIKES_EXPORT_FILE) if export else None
+            runner.start("Delete likes", lambda progress: run_like_cleanup(driver, candidate_ids, progress, incremental, export_file), RunProgress())
+            st.rerun()
 
 if __name__ == "__main__":
     main()
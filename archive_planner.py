@@ -0,0 +1,142 @@
+# Offline deletion planner for the official X data export.
+# Stream-parses data/tweets.js or data/like.js (a "window.YTD.<name>.part0 = [...]"
+# JavaScript assignment) one entry at a time, applies the same selection rules the
+# live cleanup uses and writes the candidate status ids, one per line.
+#
+#   python archive_planner.py data/tweets.js -o candidates.txt --before 2023-01-01
+#   python archive_planner.py data/like.js -o likes.txt
+#
+# Counts in the archive are a snapshot from export time and it carries no reply
+# counts, so the live tools still re-check engagement before deleting anything.
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+
+CHUNK_SIZE = 1 << 16
+ARCHIVE_DATE_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+
+def iter_archive_entries(path, chunk_size=CHUNK_SIZE):
+    # Yields each element of the top-level array without loading the whole file
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        while "[" not in buf:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            buf += chunk
+        pos = buf.index("[") + 1
+        eof = False
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) and buf[pos] == "]":
+                return
+            try:
+                if pos >= len(buf):
+                    raise ValueError("need more data")
+                entry, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if eof:
+                    raise ValueError(f"Truncated or malformed archive file: {path}")
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+            yield entry
+            buf, pos = buf[end:], 0
+
+def archive_tweets(path):
+    for entry in iter_archive_entries(path):
+        tweet = entry.get("tweet", entry)
+        full_text = tweet.get("full_text", "")
+        yield {
+            "status_id": tweet.get("id_str") or str(tweet.get("id")),
+            "created_at": datetime.strptime(tweet["created_at"], ARCHIVE_DATE_FORMAT) if tweet.get("created_at") else None,
+            "likes": int(tweet.get("favorite_count") or 0),
+            "reposts": int(tweet.get("retweet_count") or 0),
+            "is_reply": bool(tweet.get("in_reply_to_status_id_str")),
+            "is_retweet": full_text.startswith("RT @"),
+            "text": full_text,
+        }
+
+def archive_likes(path):
+    for entry in iter_archive_entries(path):
+        like = entry.get("like", entry)
+        if like.get("tweetId"):
+            yield {"status_id": like["tweetId"], "text": like.get("fullText", "")}
+
+def plan_tweet_deletions(path, kind="both", zero_engagement=True, before=None, after=None):
+    # Same selection as delete_empty_tweets_in_tab (0 likes and 0 reposts; replies aren't in the
+    # archive), restricted to Posts and/or Replies and optionally to a created_at window
+    for tweet in archive_tweets(path):
+        if tweet["is_retweet"]:
+            continue # Reposts of other people's tweets have no "Delete" in the More menu
+        if kind == "posts" and tweet["is_reply"]:
+            continue
+        if kind == "replies" and not tweet["is_reply"]:
+            continue
+        if zero_engagement and (tweet["likes"] or tweet["reposts"]):
+            continue
+        if before and tweet["created_at"] and tweet["created_at"] >= before:
+            continue
+        if after and tweet["created_at"] and tweet["created_at"] < after:
+            continue
+        yield tweet["status_id"]
+
+def plan_like_removals(path):
+    for like in archive_likes(path):
+        yield like["status_id"]
+
+def read_candidate_ids(lines):
+    # Accepts the planner's output (an open file or any iterable of lines); ignores blanks and # comments
+    ids = []
+    seen = set()
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        status_id = line.split("#", 1)[0].strip()
+        if status_id.isdigit() and status_id not in seen:
+            seen.add(status_id)
+            ids.append(status_id)
+    return ids
+
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan X/Twitter cleanup offline from a data archive.")
+    parser.add_argument("archive_file", help="Path to data/tweets.js or data/like.js from the X data export")
+    parser.add_argument("-o", "--output", default="-", help="Candidate id list to write (default: stdout)")
+    parser.add_argument("--kind", choices=("posts", "replies", "both"), default="both", help="Which own tweets to plan (tweets.js only)")
+    parser.add_argument("--any-engagement", action="store_true", help="Don't require 0 likes and 0 reposts (tweets.js only)")
+    parser.add_argument("--before", type=parse_date, help="Only tweets created before YYYY-MM-DD (tweets.js only)")
+    parser.add_argument("--after", type=parse_date, help="Only tweets created on/after YYYY-MM-DD (tweets.js only)")
+    args = parser.parse_args(argv)
+
+    with open(args.archive_file, "r", encoding="utf-8") as f:
+        head = f.read(256)
+    if ".like." in head:
+        ids = plan_like_removals(args.archive_file)
+    else:
+        ids = plan_tweet_deletions(
+            args.archive_file, kind=args.kind, zero_engagement=not args.any_engagement,
+            before=args.before, after=args.after,
+        )
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    count = 0
+    try:
+        for status_id in ids:
+            out.write(status_id + "\n")
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Planned {count} candidates from {args.archive_file}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+# Offline throughput benchmark for the cleanup tools, run against mock_x.py.
+# Reports items/minute, WebDriver commands per item and p50/p95 per-item latency
+# (time between consecutive server-side completions) as JSON, plus the tools' own per-phase
+# timings (metrics.py).
+#
+#   python benchmark.py likes --likes 200
+#   python benchmark.py posts --posts 300 --zero-fraction 0.5 --latency-ms 100
+#   python benchmark.py direct --posts 300 --headless -o bench.json
+#   python benchmark.py pipelined --posts 300 --latency-ms 150   # scan in one browser, delete in another
+#   python benchmark.py posts --media-kb 200 --compare-lean   # before/after for lean mode
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from metrics import CommandCounter
+from mock_x import MockTimeline, start_server
+from progress import RunProgress
+
+SCENARIOS = ("likes", "posts", "replies", "direct", "pipelined")
+
+class ResourceSampler(threading.Thread):
+    # Samples CPU time and RSS of the chromedriver + Chrome process tree from /proc (Linux only)
+    def __init__(self, root_pid, interval=0.5):
+        super().__init__(daemon=True)
+        self.root_pid = root_pid
+        self.interval = interval
+        self.cpu_by_pid = {}
+        self.rss_samples = []
+        self.stopped = threading.Event()
+        self.page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self.ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def tree(self):
+        children = {}
+        for entry in os.listdir("/proc"):
+            if entry.isdigit():
+                try:
+                    with open(f"/proc/{entry}/stat") as f:
+                        fields = f.read().rsplit(")", 1)[1].split()
+                    children.setdefault(int(fields[1]), []).append(int(entry))
+                except OSError:
+                    continue
+        pids, stack = [], [self.root_pid]
+        while stack:
+            pid = stack.pop()
+            pids.append(pid)
+            stack.extend(children.get(pid, []))
+        return pids
+
+    def sample(self):
+        rss = 0
+        for pid in self.tree():
+            try:
+                with open(f"/proc/{pid}/stat") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+            except OSError:
+                continue
+            # Fields after the command name: utime/stime are 12/13, rss (pages) is 22
+            self.cpu_by_pid[pid] = (int(fields[11]) + int(fields[12])) / self.ticks
+            rss += int(fields[21]) * self.page_size
+        self.rss_samples.append(rss)
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.sample()
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.sample()
+        return {
+            "cpu_s": round(sum(self.cpu_by_pid.values()), 2),
+            "rss_peak_mb": round(max(self.rss_samples) / 2**20, 1) if self.rss_samples else None,
+            "rss_mean_mb": round(sum(self.rss_samples) / len(self.rss_samples) / 2**20, 1) if self.rss_samples else None,
+        }
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+def summarize(scenario, timeline, started, finished, commands):
+    completions = [t for t, _op, _id, status in timeline.events if status == 200]
+    failures = sum(1 for *_rest, status in timeline.events if status != 200)
+    per_item = []
+    previous = started
+    for t in completions:
+        per_item.append(t - previous)
+        previous = t
+    items = len(completions)
+    duration = finished - started
+    return {
+        "scenario": scenario,
+        "items": items,
+        "failed_requests": failures,
+        "duration_s": round(duration, 3),
+        "items_per_minute": round(items / duration * 60, 2) if duration > 0 else None,
+        "webdriver_commands": commands,
+        "commands_per_item": round(commands / items, 2) if items else None,
+        "latency_p50_s": round(percentile(per_item, 50), 3) if per_item else None,
+        "latency_p95_s": round(percentile(per_item, 95), 3) if per_item else None,
+    }
+
+def run_scenario(driver, scenario, base_url, timeline, progress, make_worker_driver=None):
+    # Imported here so the mock server can be used without Selenium/Streamlit installed
+    import app
+    import streamlit_app
+
+    driver.get(f"{base_url}/home")
+    if scenario == "likes":
+        app.delete_likes(driver, progress=progress)
+    elif scenario == "posts":
+        streamlit_app.delete_empty_tweets_in_tab(driver, "Posts", progress=progress)
+    elif scenario == "replies":
+        streamlit_app.delete_empty_tweets_in_tab(driver, "Replies", progress=progress)
+    elif scenario == "direct":
+        streamlit_app.delete_tweets_by_id(driver, timeline.zero_engagement_ids(), base_url=base_url, progress=progress)
+    elif scenario == "pipelined":
+        worker_driver = make_worker_driver()
+        try:
+            streamlit_app.delete_empty_tweets_pipelined(driver, worker_driver, "Posts", progress=progress, base_url=base_url)
+        finally:
+            worker_driver.quit()
+
+def build_driver(headless, lean=False):
+    from session_core import initialize_driver
+
+    # Fresh profile: no cookies needed against the mock
+    return initialize_driver(profile_dir=None, lean=lean, headless=headless)
+
+def run_once(args, lean=False):
+    timeline = MockTimeline(args.posts, args.likes, args.zero_fraction, args.reply_fraction, args.seed, args.page_size)
+    server, base_url = start_server(timeline, 0, args.latency_ms, args.ui_latency_ms, args.media_kb)
+    driver = build_driver(args.headless, lean)
+    progress = RunProgress(log_file=None) # Silent; only its per-phase metrics are reported
+    sampler = None
+    counters = [CommandCounter(driver)]
+
+    def make_worker_driver():
+        # The pipelined scenario's deleting browser is counted too
+        worker = build_driver(args.headless, lean)
+        counters.append(CommandCounter(worker))
+        return worker
+
+    try:
+        if os.path.isdir("/proc"):
+            sampler = ResourceSampler(driver.service.process.pid)
+            sampler.start()
+        started = time.monotonic()
+        run_scenario(driver, args.scenario, base_url, timeline, progress, make_worker_driver)
+        finished = time.monotonic()
+        resources = sampler.stop() if sampler else {}
+    finally:
+        driver.quit()
+        server.shutdown()
+
+    report = summarize(args.scenario, timeline, started, finished, sum(counter.count for counter in counters))
+    report["webdriver_commands_by_browser"] = [counter.count for counter in counters]
+    report.update(resources)
+    report["lean"] = lean
+    report["media_mb_served"] = round(timeline.media_bytes_served / 2**20, 2)
+    report["phases_s"] = {name: {k: v for k, v in h.items() if k != "buckets"} for name, h in progress.metrics.report()["phases_s"].items()}
+    return report
+
+def compare(baseline, lean):
+    change = {}
+    for key in ("items_per_minute", "commands_per_item", "latency_p50_s", "cpu_s", "rss_peak_mb", "media_mb_served"):
+        before, after = baseline.get(key), lean.get(key)
+        if before and after is not None:
+            change[key] = f"{(after - before) / before * 100:+.1f}%"
+    return {"baseline": baseline, "lean": lean, "change": change}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the cleanup tools against a local mock X.")
+    parser.add_argument("scenario", choices=SCENARIOS)
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--likes", type=int, default=100)
+    parser.add_argument("--zero-fraction", type=float, default=0.3)
+    parser.add_argument("--reply-fraction", type=float, default=0.4)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--ui-latency-ms", type=int, default=50)
+    parser.add_argument("--media-kb", type=int, default=0, help="Attach an image and autoplay video of this size to every mock article")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--lean", action="store_true", help="Run with the lean browser profile")
+    parser.add_argument("--compare-lean", action="store_true", help="Run twice, default then lean profile, and report the change")
+    parser.add_argument("-o", "--output", help="Also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    if args.compare_lean:
+        report = compare(run_once(args, lean=False), run_once(args, lean=True))
+    else:
+        report = run_once(args, lean=args.lean)
+    report["config"] = {k: v for k, v in vars(args).items() if k not in ("scenario", "output", "lean", "compare_lean")}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
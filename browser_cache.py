@@ -0,0 +1,45 @@
+# Warm browser startup: a locally cached chromedriver path, a reusable Chrome profile
+# (so cookies survive between sessions) and a cheap check for the X session cookie.
+import os
+
+DRIVER_PATH_CACHE = ".chromedriver_path"
+PROFILE_DIR = os.path.abspath("chrome_profile")
+AUTH_COOKIE = "auth_token"
+PROFILE_IN_USE = "user data directory is already in use" # chromedriver's error when another Chrome owns the profile
+
+def cached_chromedriver_path(cache_file=DRIVER_PATH_CACHE, refresh=False):
+    # ChromeDriverManager().install() does a version lookup (and maybe a download) on every call;
+    # reuse the last resolved binary while it still exists. refresh=True resolves it again, for when
+    # the cached binary no longer matches Chrome (see session_core.make_driver_factory).
+    if not refresh and os.path.exists(cache_file):
+        with open(cache_file, "r") as f:
+            path = f.read().strip()
+        if path and os.path.isfile(path) and os.access(path, os.X_OK):
+            return path
+    from webdriver_manager.chrome import ChromeDriverManager # Slow to import; only needed on a cache miss
+    path = ChromeDriverManager().install()
+    with open(cache_file, "w") as f:
+        f.write(path)
+    return path
+
+def use_persistent_profile(options, profile_dir=PROFILE_DIR):
+    # Only one Chrome at a time can own a profile directory
+    os.makedirs(profile_dir, exist_ok=True)
+    options.add_argument(f"--user-data-dir={profile_dir}")
+    return options
+
+def drop_persistent_profile(options, profile_dir=PROFILE_DIR):
+    # Back to a fresh throwaway profile
+    argument = f"--user-data-dir={profile_dir}"
+    if argument in options.arguments:
+        options.arguments.remove(argument)
+    return options
+
+def profile_in_use(error):
+    return PROFILE_IN_USE in str(error)
+
+def has_auth_cookie(driver, base_url="https://x.com"):
+    # robots.txt is a tiny same-origin page: enough to read the domain's cookies without loading the app
+    if not driver.current_url.startswith(base_url):
+        driver.get(f"{base_url}/robots.txt")
+    return driver.get_cookie(AUTH_COOKIE) is not None
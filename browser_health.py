@@ -0,0 +1,81 @@
+# Memory watchdog for long timeline walks. The infinite timeline keeps growing Chrome's JS heap
+# and DOM until every drain and scroll slows down and the tab eventually crashes, so the walks
+# sample the page's Performance.getMetrics over CDP every SAMPLE_INTERVAL seconds and, once the
+# heap or node count crosses its limit, reload the timeline (a fresh document and heap) and
+# carry on from where they were (the tweet walks reopen a search for the tweets below the
+# last one they reached, see streamlit_app.resume_url, rather than the top of the timeline).
+# The reload stays in the same tab on purpose: CDP settings applied to the tab (lean mode's URL
+# blocking, see session_core.apply_lean_mode) survive it.
+# A walk only reloads again once it has handled new items since the last reload (a page that is
+# over the limit right after catching up would otherwise reload in a loop), and at most
+# MAX_RELOADS times in all; past that it runs on unwatched.
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from extractor import ARTICLE_XPATH
+from waits import wait_for_element
+
+HEAP_LIMIT_MB = 512
+NODE_LIMIT = 150_000
+SAMPLE_INTERVAL = 30.0 # Seconds between samples
+MAX_RELOADS = 10
+MB = 1024 * 1024
+
+class BrowserHealth:
+    def __init__(self, driver, heap_limit_mb=HEAP_LIMIT_MB, node_limit=NODE_LIMIT, sample_interval=SAMPLE_INTERVAL, max_reloads=MAX_RELOADS):
+        self.driver = driver
+        self.heap_limit = heap_limit_mb * MB
+        self.node_limit = node_limit
+        self.sample_interval = sample_interval
+        self.max_reloads = max_reloads
+        self.next_sample = 0.0
+        self.last = None # Latest sample, {"JSHeapUsedSize": bytes, "Nodes": count}
+        self.reloads = 0
+        self.advanced = True # New items handled since the last reload, see advance()
+        try:
+            driver.execute_cdp_cmd("Performance.enable", {})
+            self.available = True
+        except (AttributeError, WebDriverException):
+            self.available = False # Not Chrome, or no CDP: the walk just runs unwatched
+
+    def sample(self):
+        try:
+            metrics = self.driver.execute_cdp_cmd("Performance.getMetrics", {}).get("metrics", [])
+        except WebDriverException:
+            return None
+        values = {m["name"]: m["value"] for m in metrics}
+        self.last = {"JSHeapUsedSize": values.get("JSHeapUsedSize", 0), "Nodes": values.get("Nodes", 0)}
+        return self.last
+
+    def advance(self):
+        # Called by the walk whenever a pass handled items it hadn't seen before
+        self.advanced = True
+
+    def over_limit(self):
+        # Why the page needs a reload, or None. Samples at most once per interval, so the call is
+        # free on most scroll passes.
+        now = time.monotonic()
+        if not self.available or not self.advanced or self.exhausted or now < self.next_sample:
+            return None
+        self.next_sample = now + self.sample_interval
+        sample = self.sample()
+        if sample is None:
+            return None
+        if sample["JSHeapUsedSize"] > self.heap_limit:
+            return f"JS heap at {sample['JSHeapUsedSize'] / MB:.0f} MB (limit {self.heap_limit / MB:.0f} MB)"
+        if sample["Nodes"] > self.node_limit:
+            return f"{sample['Nodes']:.0f} DOM nodes (limit {self.node_limit})"
+        return None
+
+    @property
+    def exhausted(self):
+        return self.reloads >= self.max_reloads
+
+    def reload(self, url=None, timeout=15):
+        # Fresh document, for url or the same timeline; the page-side article queue starts over with it
+        self.driver.get(url or self.driver.current_url)
+        self.reloads += 1
+        self.advanced = False
+        self.next_sample = time.monotonic() + self.sample_interval
+        return wait_for_element(self.driver, ARTICLE_XPATH, timeout=timeout) is not None
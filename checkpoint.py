@@ -0,0 +1,164 @@
+# On-disk checkpoint of per-item verdicts, keyed by status id, so an interrupted
+# cleanup run can resume without re-evaluating items it already settled.
+import sqlite3
+import threading
+import time
+
+CHECKPOINT_FILE = "cleanup_checkpoint.db"
+
+KEPT = "kept"
+DELETED = "deleted"
+FAILED = "failed"
+SETTLED_VERDICTS = (KEPT, DELETED) # FAILED items are retried on the next run
+
+# Scopes: own tweets (Posts and Replies share one, a tweet's verdict doesn't depend on the tab) and likes
+TWEETS = "tweets"
+LIKES = "likes"
+
+class CheckpointStore:
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock() # Pipelined runs record from a scanning and a deleting thread
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            " scope TEXT NOT NULL, status_id TEXT NOT NULL, verdict TEXT NOT NULL, updated_at REAL NOT NULL,"
+            " PRIMARY KEY (scope, status_id))"
+        )
+        # Per scope and timeline: newest status id a completed walk processed, the oldest id it
+        # left open (FAILED, or too young for the rules), and the id range a walk stopped by the
+        # scroll cap covered above it, see Watermark below
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS watermarks ("
+            " scope TEXT NOT NULL, timeline TEXT NOT NULL, newest TEXT, open_floor TEXT,"
+            " walked_top TEXT, walked_floor TEXT, updated_at REAL NOT NULL,"
+            " PRIMARY KEY (scope, timeline))"
+        )
+        for column in ("walked_top", "walked_floor"): # Checkpoints written before the walked range existed
+            try:
+                self.conn.execute(f"ALTER TABLE watermarks ADD COLUMN {column} TEXT")
+            except sqlite3.OperationalError:
+                pass # Already there
+        self.conn.commit()
+        # Settled ids are held in memory so lookups in the hot loop are O(1) set checks
+        self.settled = {}
+        for scope, status_id in self.conn.execute(
+            f"SELECT scope, status_id FROM items WHERE verdict IN ({','.join('?' * len(SETTLED_VERDICTS))})",
+            SETTLED_VERDICTS,
+        ):
+            self.settled.setdefault(scope, set()).add(status_id)
+
+    def is_settled(self, scope, status_id):
+        return status_id is not None and status_id in self.settled.get(scope, ())
+
+    def record(self, scope, status_id, verdict):
+        if status_id is None:
+            return
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO items (scope, status_id, verdict, updated_at) VALUES (?, ?, ?, ?)",
+                (scope, status_id, verdict, time.time()),
+            )
+            self.conn.commit() # Commit per item: a crash loses at most the item in flight
+            if verdict in SETTLED_VERDICTS:
+                self.settled.setdefault(scope, set()).add(status_id)
+            else:
+                self.settled.get(scope, set()).discard(status_id)
+
+    def counts(self, scope):
+        with self.lock:
+            return dict(self.conn.execute(
+                "SELECT verdict, COUNT(*) FROM items WHERE scope = ? GROUP BY verdict", (scope,)
+            ).fetchall())
+
+    def watermark(self, scope, timeline):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT newest, open_floor, walked_top, walked_floor FROM watermarks WHERE scope = ? AND timeline = ?",
+                (scope, timeline),
+            ).fetchone()
+        return row or (None, None, None, None)
+
+    def set_watermark(self, scope, timeline, newest, open_floor, walked_top=None, walked_floor=None):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO watermarks (scope, timeline, newest, open_floor, walked_top, walked_floor, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (scope, timeline, newest, open_floor, walked_top, walked_floor, time.time()),
+            )
+            self.conn.commit()
+
+    def clear(self, scope):
+        self.conn.execute("DELETE FROM items WHERE scope = ?", (scope,))
+        self.conn.execute("DELETE FROM watermarks WHERE scope = ?", (scope,))
+        self.conn.commit()
+        self.settled.pop(scope, None)
+
+    def close(self):
+        self.conn.close()
+
+def _id(value):
+    return int(value) if value else None
+
+def _text(value):
+    return str(value) if value else None
+
+class Watermark:
+    # High-watermark for incremental runs over a reverse-chronological timeline. Status ids are
+    # snowflakes, so they order by creation time: once a walk reaches ids at or below the newest id
+    # a previous complete walk processed, and below the oldest item it left open, everything
+    # further down was settled before and the scroll can stop.
+    #
+    # A walk stopped by the scroll cap never gets down to that boundary. It keeps the boundary as
+    # it was and records the range it did cover (walked_top down to walked_floor): the next walk
+    # scrolls through that range without counting it against the cap and carries on below it,
+    # until one walk gets all the way down and moves the boundary up.
+    def __init__(self, store, scope, timeline):
+        self.store = store
+        self.scope = scope
+        self.timeline = timeline
+        newest, open_floor, walked_top, walked_floor = map(_id, store.watermark(scope, timeline))
+        self.newest = newest
+        self.open_floor = open_floor
+        self.walked_top = walked_top
+        self.walked_floor = walked_floor
+        self.seen_newest = None
+        self.lowest = None # Oldest own id this walk reached
+        self.open_ids = set()
+        self.complete = False # Set by the walk once it has covered everything down to the boundary
+        self.capped = False # Set by the walk when it stops at the scroll cap instead
+
+    def reached(self, status_id):
+        status_id = int(status_id)
+        if self.seen_newest is None or status_id > self.seen_newest:
+            self.seen_newest = status_id
+        if self.lowest is None or status_id < self.lowest:
+            self.lowest = status_id
+        return (self.newest is not None and status_id <= self.newest
+                and (self.open_floor is None or status_id < self.open_floor))
+
+    def walked(self, status_id):
+        # Inside the range an earlier capped walk already covered
+        return self.walked_floor is not None and self.walked_floor <= int(status_id) <= self.walked_top
+
+    def leave_open(self, status_id):
+        self.open_ids.add(int(status_id))
+
+    def settle(self, status_id):
+        self.open_ids.discard(int(status_id))
+
+    def save(self):
+        # An interrupted walk leaves everything as it was
+        if self.seen_newest is None:
+            return
+        if self.complete:
+            newest = max(self.seen_newest, self.newest or 0)
+            open_floor = min(self.open_ids) if self.open_ids else None
+            self.store.set_watermark(self.scope, self.timeline, str(newest), _text(open_floor))
+        elif self.capped:
+            # The boundary stays; the covered range grows when this walk ran on into the last one
+            top, floor = self.seen_newest, self.lowest
+            if self.walked_floor is not None and floor <= self.walked_top:
+                top, floor = max(top, self.walked_top), min(floor, self.walked_floor)
+            self.store.set_watermark(self.scope, self.timeline, _text(self.newest), _text(self.open_floor), str(top), str(floor))
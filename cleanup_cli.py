@@ -0,0 +1,197 @@
+# Headless entry point for scheduled cleanup runs (cron, batch hosts). Runs the same cleanup
+# functions as the two Streamlit apps without importing Streamlit, prints a JSON summary on
+# stdout (log lines go to stderr and cleanup.log) and exits with a code a scheduler can act on.
+#
+#   python cleanup_cli.py likes --limit 500
+#   python cleanup_cli.py both --older-than-days 365 --max-likes 2 --incremental
+#   python cleanup_cli.py posts --dry-run --text-regex "giveaway|RT to win"
+#   python cleanup_cli.py replies --candidates candidates.txt --direct -o summary.json
+import argparse
+import json
+import os
+import sys
+import time
+
+from archive_planner import read_candidate_ids
+from browser_cache import PROFILE_DIR
+from jobs import JobCancelled
+from like_export import LIKES_EXPORT_FILE
+from progress import LOG_FILE, RunProgress
+from rules import DEFAULT_RULES, compile_rules
+from session_core import COOKIE_FILE
+
+TARGETS = ("likes", "posts", "replies", "both")
+# Same action names the Streamlit form passes to run_tweet_cleanup
+TWEET_ACTIONS = {"posts": "Only My Posts", "replies": "Only My Replies", "both": "Both My Posts & My Replies"}
+
+EXIT_OK = 0
+EXIT_FAILURES = 1 # The run finished, but some items failed (they are retried on the next run)
+EXIT_USAGE = 2 # Bad arguments (argparse's own code)
+EXIT_LOGIN = 3 # No cookie file, or the session isn't logged in
+EXIT_ERROR = 4 # The run stopped on an unexpected error
+EXIT_INTERRUPTED = 130 # Ctrl-C / SIGINT
+
+class ConsoleProgress(RunProgress):
+    # Also echoes log lines to stderr; debug lines only with --verbose
+    def __init__(self, verbose=False, quiet=False, **kwargs):
+        super().__init__(**kwargs)
+        self.verbose = verbose
+        self.quiet = quiet
+
+    def log(self, message, level="info"):
+        super().log(message, level)
+        if not self.quiet and (level != "debug" or self.verbose):
+            print(f"{time.strftime('%H:%M:%S')} {level.upper():<7} {message}", file=sys.stderr, flush=True)
+
+def limit_gate(progress, limit, dry_run):
+    # Ends the run (the same way a cancelled job ends) once `limit` items are deleted, or matched in a dry run
+    counter = "matched" if dry_run else "deleted"
+
+    def gate():
+        if progress.counters()[counter] >= limit:
+            progress.info(f"Reached the limit of {limit} {counter} items. Stopping.")
+            raise JobCancelled()
+
+    return gate
+
+def build_rules(args):
+    spec = {} if args.any_engagement else dict(DEFAULT_RULES)
+    for key in ("max_replies", "max_reposts", "max_likes", "older_than_days", "newer_than_days", "text_contains", "text_regex", "has_media"):
+        value = getattr(args, key)
+        if value is not None:
+            spec[key] = value
+    rules = compile_rules(spec)
+    if args.target != "likes" and not rules.checks and not args.all:
+        # Nobody is there to see a preview on a scheduled run, so "delete everything" has to be asked for
+        raise ValueError("no deletion criteria left: every post and reply would match. Pass --all if that is intended")
+    return rules
+
+def run(args, rules, progress):
+    # Imported here so --help and argument errors don't pay for Selenium
+    import app
+    import streamlit_app
+    from session_core import initialize_driver, make_driver_factory, start_session
+
+    driver = initialize_driver(
+        make_driver_factory(), profile_dir=args.profile_dir or None, lean=args.lean, headless=not args.headed, log=progress.warning,
+    )
+    try:
+        try:
+            logged_in = start_session(driver, args.cookies, log=progress.info)
+        except (OSError, ValueError) as e: # Missing or unreadable cookie file and no stored session
+            progress.error(f"Could not load cookies from '{args.cookies}': {e}")
+            logged_in = False
+        if not logged_in:
+            progress.error("Not logged in. Export fresh cookies or log in once through the Streamlit app.")
+            return None
+        candidate_ids = None
+        if args.candidates:
+            with open(args.candidates, "r", encoding="utf-8") as f:
+                candidate_ids = read_candidate_ids(f)
+            progress.info(f"Loaded {len(candidate_ids)} planned candidate ids from {args.candidates}.")
+        if args.target == "likes":
+            return app.run_like_cleanup(
+                driver, candidate_ids, progress, incremental=args.incremental,
+                export_file=None if args.no_export else args.export_file, dry_run=args.dry_run,
+            )
+        return streamlit_app.run_tweet_cleanup(
+            driver, TWEET_ACTIONS[args.target], candidate_ids, direct_mode=args.direct and candidate_ids is not None,
+            resume=not args.no_resume, progress=progress, rules=rules, dry_run=args.dry_run, incremental=args.incremental,
+        )
+    finally:
+        driver.quit()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run an X/Twitter cleanup without the Streamlit UI and print a JSON summary.")
+    parser.add_argument("target", choices=TARGETS, help="likes: remove likes; posts/replies/both: delete own tweets matching the rules")
+    parser.add_argument("--cookies", default=COOKIE_FILE, help=f"Cookie file to log in with (default: {COOKIE_FILE})")
+    parser.add_argument("--profile-dir", default=PROFILE_DIR, help="Chrome profile to reuse a stored session from ('' for a fresh one)")
+    parser.add_argument("--limit", type=int, help="Stop after this many items deleted (matched, with --dry-run)")
+    parser.add_argument("--dry-run", action="store_true", help="Only count what would be deleted; nothing is clicked or checkpointed")
+    parser.add_argument("--incremental", action="store_true", help="Stop scrolling at items settled by the last complete run")
+    parser.add_argument("--no-resume", action="store_true", help="Clear the checkpoint for these rules first (tweets only)")
+    parser.add_argument("--candidates", help="Candidate id list from archive_planner.py; only these ids are considered")
+    parser.add_argument("--direct", action="store_true", help="With --candidates: open each id's status page instead of the timeline (tweets only)")
+    parser.add_argument("--lean", action="store_true", help="Small window, no images/video/fonts")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window instead of running headless")
+    rules = parser.add_argument_group("deletion rules (tweets only; default: 0 replies, 0 reposts, 0 likes)")
+    rules.add_argument("--any-engagement", action="store_true", help="Drop the 0-engagement default")
+    rules.add_argument("--all", action="store_true", help="Allow a run with no criteria at all, which deletes every post/reply it walks")
+    rules.add_argument("--max-replies", type=int)
+    rules.add_argument("--max-reposts", type=int)
+    rules.add_argument("--max-likes", type=int)
+    rules.add_argument("--older-than-days", type=int)
+    rules.add_argument("--newer-than-days", type=int)
+    rules.add_argument("--text-contains")
+    rules.add_argument("--text-regex")
+    media = rules.add_mutually_exclusive_group()
+    media.add_argument("--has-media", dest="has_media", action="store_const", const=True)
+    media.add_argument("--no-media", dest="has_media", action="store_const", const=False)
+    export = parser.add_argument_group("likes export")
+    export.add_argument("--export-file", default=LIKES_EXPORT_FILE, help="JSONL record of removed likes (.gz to compress)")
+    export.add_argument("--no-export", action="store_true")
+    parser.add_argument("-o", "--output", help="Also write the JSON summary to this file")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Echo debug lines to stderr too")
+    parser.add_argument("-q", "--quiet", action="store_true", help="No log lines on stderr (the log file is still written)")
+    args = parser.parse_args(argv)
+
+    try:
+        rules = build_rules(args)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.limit is not None and args.limit < 1:
+        parser.error("--limit must be at least 1")
+    if args.candidates and not os.path.exists(args.candidates):
+        parser.error(f"candidate file '{args.candidates}' not found")
+
+    progress = ConsoleProgress(verbose=args.verbose, quiet=args.quiet)
+    if args.limit:
+        progress.gate = limit_gate(progress, args.limit, args.dry_run)
+    report = {"target": args.target, "dry_run": args.dry_run}
+    if args.target != "likes":
+        report["rules"] = rules.description
+    started = time.monotonic()
+    result = None
+    error = None
+    try:
+        if not os.path.exists(args.cookies):
+            progress.warning(f"Cookie file '{args.cookies}' not found; relying on a session stored in the browser profile.")
+        result = run(args, rules, progress)
+        if result is None:
+            status, code = "login_failed", EXIT_LOGIN
+        else:
+            status, code = "completed", EXIT_OK
+    except JobCancelled:
+        status, code = "limit_reached", EXIT_OK
+    except KeyboardInterrupt:
+        status, code = "interrupted", EXIT_INTERRUPTED
+    except Exception as e:
+        progress.error(f"Run stopped: {e}")
+        status, code, error = "error", EXIT_ERROR, str(e)
+    finally:
+        progress.close()
+
+    counts = progress.counters()
+    duration = time.monotonic() - started
+    handled = counts["deleted"] + counts["skipped"] + counts["failed"] + (counts["matched"] if args.dry_run else 0)
+    if code == EXIT_OK and counts["failed"]:
+        code = EXIT_FAILURES
+    report.update({
+        "status": status,
+        "exit_code": code,
+        "counts": counts,
+        "failures": counts["failed"],
+        "duration_s": round(duration, 3),
+        "items_per_minute": round(handled / duration * 60, 2) if duration > 0 else None,
+        "summary": result,
+        "error": error,
+        "log_file": LOG_FILE,
+    })
+    print(json.dumps(report, indent=2, default=str))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+    return code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+# Batched article extraction: one execute_script round trip returns the
+# metadata for every tweet article on the page, instead of several
+# find_elements / get_attribute / .text calls per article.
+import re
+from decimal import Decimal
+
+ARTICLE_XPATH = '//article[@data-testid="tweet"]'
+
+# Shared by the one-shot extractor and the queue drain below
+DESCRIBE_ARTICLE_JS = r"""
+const statText = (article, ids) => {
+    for (const id of ids) {
+        const btn = article.querySelector('button[data-testid="' + id + '"]');
+        if (!btn) continue;
+        const span = btn.querySelector('span[data-testid="app-text-transition-container"] > span');
+        return span ? span.textContent.trim() : "";
+    }
+    return "";
+};
+// Permalink of the tweet in the timeline cell right above, unless it is a repost/pinned one
+const aboveHref = (article) => {
+    const cell = article.closest('[data-testid="cellInnerDiv"]');
+    const prev = cell ? cell.previousElementSibling : null;
+    const above = prev ? prev.querySelector('article[data-testid="tweet"]') : null;
+    if (!above || above.querySelector('[data-testid="socialContext"]')) return null;
+    const time = above.querySelector('a[href*="/status/"] time');
+    return time ? time.closest('a').href : null;
+};
+const describe = (article, idx) => {
+    const time = article.querySelector('a[href*="/status/"] time');
+    const link = time ? time.closest('a') : null;
+    const text = article.innerText || "";
+    const body = article.querySelector('[data-testid="tweetText"]');
+    return {
+        idx: idx,
+        element: article,
+        href: link ? link.href : null,
+        text: text.slice(0, 280),
+        timestamp: time ? time.getAttribute("datetime") : null,
+        tweet_text: body ? body.innerText : "",
+        is_reply: /(^|\n)Replying to\s/.test(text),
+        above_href: aboveHref(article),
+        social_context: !!article.querySelector('[data-testid="socialContext"]'),
+        has_media: !!article.querySelector('[data-testid="tweetPhoto"], [data-testid="videoPlayer"], [data-testid="videoComponent"]'),
+        replies: statText(article, ["reply"]),
+        reposts: statText(article, ["retweet", "unretweet"]),
+        likes: statText(article, ["like", "unlike"]),
+        unlike_button: article.querySelector('[data-testid="unlike"]'),
+    };
+};
+"""
+
+EXTRACT_ARTICLES_JS = DESCRIBE_ARTICLE_JS + r"""
+return Array.from(document.querySelectorAll('article[data-testid="tweet"]')).map(describe);
+"""
+
+# Incremental mode: a MutationObserver pushes every newly inserted tweet article into a page-side
+# queue, and Python drains it in batches, so each article is described exactly once per page load.
+# Dedupe is by permalink at drain time (X recycles nodes), falling back to node identity.
+# Installs itself on first use and again after any navigation/reload wipes the page state.
+DRAIN_ARTICLE_QUEUE_JS = DESCRIBE_ARTICLE_JS + r"""
+if (!window.__cleanupQueue) {
+    window.__cleanupQueue = [];
+    window.__cleanupSeenNodes = new WeakSet();
+    window.__cleanupSeenKeys = new Set();
+    window.__cleanupSeq = 0;
+    const enqueue = (article) => {
+        if (window.__cleanupSeenNodes.has(article)) return;
+        window.__cleanupSeenNodes.add(article);
+        window.__cleanupQueue.push(article);
+    };
+    const scan = (node) => {
+        if (node.nodeType !== 1) return;
+        if (node.matches('article[data-testid="tweet"]')) enqueue(node);
+        else node.querySelectorAll('article[data-testid="tweet"]').forEach(enqueue);
+    };
+    document.querySelectorAll('article[data-testid="tweet"]').forEach(enqueue);
+    window.__cleanupObserver = new MutationObserver((mutations) => {
+        for (const m of mutations) m.addedNodes.forEach(scan);
+    });
+    window.__cleanupObserver.observe(document.body, {childList: true, subtree: true});
+}
+const limit = arguments[0] || window.__cleanupQueue.length;
+const batch = window.__cleanupQueue.splice(0, limit);
+const out = [];
+for (const article of batch) {
+    if (!article.isConnected) continue;
+    const item = describe(article, window.__cleanupSeq++);
+    if (item.href) {
+        if (window.__cleanupSeenKeys.has(item.href)) continue;
+        window.__cleanupSeenKeys.add(item.href);
+    }
+    out.push(item);
+}
+return out;
+"""
+
+# Re-finds a single article by its permalink (the stable key) when a held reference went stale
+RESOLVE_ARTICLE_JS = DESCRIBE_ARTICLE_JS + r"""
+for (const article of document.querySelectorAll('article[data-testid="tweet"]')) {
+    const time = article.querySelector('a[href*="/status/"] time');
+    const link = time ? time.closest('a') : null;
+    if (link && link.href === arguments[0]) return describe(article, arguments[1]);
+}
+return null;
+"""
+
+QUEUE_LENGTH_JS = "return window.__cleanupQueue ? window.__cleanupQueue.length : -1;"
+
+# Drops the queue state of an earlier walk. X navigates between tabs in-page, so the state would
+# otherwise outlive the walk and the next one would skip every permalink the last one drained.
+# The next drain reinstalls the observer and queues the articles on screen.
+RESET_ARTICLE_QUEUE_JS = r"""
+if (window.__cleanupObserver) window.__cleanupObserver.disconnect();
+for (const key of ["__cleanupObserver", "__cleanupQueue", "__cleanupSeenNodes", "__cleanupSeenKeys", "__cleanupSeq"]) {
+    delete window[key];
+}
+"""
+
+# Lets an article whose node went away be queued again when X re-renders it
+FORGET_ARTICLE_JS = "if (window.__cleanupSeenKeys) window.__cleanupSeenKeys.delete(arguments[0]);"
+
+STATUS_ID_RE = re.compile(r"/status/(\d+)")
+HANDLE_RE = re.compile(r"https?://[^/]+/([A-Za-z0-9_]+)(?:[/?#]|$)")
+COUNT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*([KMB]?)", re.IGNORECASE)
+COUNT_SUFFIXES = {"": 1, "K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+
+def handle_from_href(href):
+    # Author handle of a permalink, or of a profile/timeline URL
+    match = HANDLE_RE.match(href or "")
+    return match.group(1).lower() if match else None
+
+def status_id_from_href(href):
+    if not href:
+        return None
+    match = STATUS_ID_RE.search(href)
+    return match.group(1) if match else None
+
+def classify_reply(article, own_handle):
+    # X drops the "Replying to" line when it shows a reply right under the tweet it answers, so on
+    # the account's own timeline a tweet directly below someone else's tweet is a reply too
+    parent = handle_from_href(article.get("above_href"))
+    return article["is_reply"] or (own_handle is not None and parent is not None and parent != own_handle)
+
+def parse_count(text):
+    # "12", "1,234", "1.2K", "3M". Abbreviated counts are read as the most they can stand for: X
+    # cuts digits off, so "1.2K" is anything from 1,200 to 1,299 and "1K" (the ".0" isn't shown)
+    # anything up to 1,999, and the rules compare counts against max_* limits. None means "present
+    # but unparseable", so callers can stay on the safe side.
+    text = (text or "").strip().replace(',', '')
+    if not text:
+        return 0
+    match = COUNT_RE.fullmatch(text)
+    if not match:
+        return None
+    number, suffix = match.groups()
+    if "." in number and not suffix:
+        return None # A fractional count without a suffix isn't a count
+    scale = COUNT_SUFFIXES[suffix.upper()]
+    if scale == 1:
+        return int(number)
+    step = scale // 10 ** len(number.partition(".")[2]) # Value of the last digit shown
+    return int(Decimal(number) * scale) + max(step, 1) - 1
+
+def _to_article(raw):
+    text = raw.get("text") or ""
+    return {
+        "idx": raw["idx"],
+        "element": raw["element"],
+        "href": raw.get("href"),
+        "status_id": status_id_from_href(raw.get("href")),
+        "text_preview": text[:70].replace('\n', ' '),
+        "text": raw.get("tweet_text") or "", # Just the tweet body, for text rules (rules.py)
+        "timestamp": raw.get("timestamp"),
+        "is_reply": bool(raw.get("is_reply")), # From the "Replying to" line only, see classify_reply()
+        "above_href": raw.get("above_href"),
+        "has_media": bool(raw.get("has_media")),
+        "social_context": bool(raw.get("social_context")), # "Pinned" / "You reposted": out of timeline order
+        "replies": parse_count(raw.get("replies")),
+        "reposts": parse_count(raw.get("reposts")),
+        "likes": parse_count(raw.get("likes")),
+        "unlike_button": raw.get("unlike_button"),
+    }
+
+def extract_articles(driver):
+    return [_to_article(raw) for raw in driver.execute_script(EXTRACT_ARTICLES_JS) or []]
+
+def drain_new_articles(driver, max_items=None):
+    # Only articles inserted since the last drain; one round trip regardless of how many are on the page
+    return [_to_article(raw) for raw in driver.execute_script(DRAIN_ARTICLE_QUEUE_JS, max_items or 0) or []]
+
+def resolve_article(driver, href, idx=-1):
+    # Fresh element (and metadata) for the article with this permalink, or None if X has dropped it
+    if not href:
+        return None
+    raw = driver.execute_script(RESOLVE_ARTICLE_JS, href, idx)
+    return _to_article(raw) if raw else None
+
+def queued_article_count(driver):
+    return driver.execute_script(QUEUE_LENGTH_JS)
+
+def reset_article_queue(driver):
+    # Call at the start of every walk, after navigating to its timeline
+    driver.execute_script(RESET_ARTICLE_QUEUE_JS)
+
+def forget_article(driver, href):
+    if href:
+        driver.execute_script(FORGET_ARTICLE_JS, href)
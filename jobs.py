@@ -0,0 +1,148 @@
+# Background cleanup jobs. A job runs in a worker thread that owns the WebDriver for as long
+# as it runs; the Streamlit script only starts it, sends pause/resume/cancel and polls its
+# status. The runner (logged-in driver + current job) is kept in st.cache_resource rather than
+# st.session_state, so a long run outlives reruns, closed tabs and websocket reconnects.
+import threading
+import traceback
+
+JOB_RUNNING = "running"
+JOB_PAUSED = "paused"
+JOB_CANCELLING = "cancelling"
+JOB_FINISHED = "finished"
+JOB_CANCELLED = "cancelled"
+JOB_FAILED = "failed"
+STATUS_POLL_INTERVAL = 1.0 # Seconds between UI polls of a running job
+
+class JobCancelled(BaseException):
+    # BaseException so the cleanup loops' broad `except Exception` handlers don't swallow it
+    pass
+
+class CleanupJob(threading.Thread):
+    def __init__(self, label, work, progress):
+        super().__init__(name=f"cleanup-{label}", daemon=True)
+        self.label = label
+        self.work = work # Called as work(progress) in the worker thread; returns a summary dict
+        self.progress = progress
+        self.progress.gate = self.checkpoint
+        self.resume_event = threading.Event()
+        self.resume_event.set()
+        self.cancel_event = threading.Event()
+        self.state = JOB_RUNNING
+        self.result = None
+        self.error = None
+
+    def run(self):
+        try:
+            self.result = self.work(self.progress)
+            self.state = JOB_FINISHED
+        except JobCancelled:
+            self.progress.warning("Cancelled. Items handled so far are kept in the checkpoint.")
+            self.state = JOB_CANCELLED
+        except Exception as e:
+            self.progress.error(f"Job failed: {e}\n{traceback.format_exc()}")
+            self.error = str(e)
+            self.state = JOB_FAILED
+        finally:
+            self.progress.close()
+
+    def checkpoint(self):
+        # Called by the cleanup loops between items: blocks while paused, raises once cancelled
+        if not self.resume_event.is_set():
+            self.progress.info("Paused.")
+            self.resume_event.wait()
+            if not self.cancel_event.is_set():
+                self.progress.info("Resumed.")
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+    def pause(self):
+        # Takes effect at the worker's next checkpoint, i.e. after the item in flight
+        if self.is_alive() and not self.cancel_event.is_set():
+            self.resume_event.clear()
+            self.state = JOB_PAUSED
+
+    def resume(self):
+        if not self.cancel_event.is_set():
+            self.state = JOB_RUNNING
+        self.resume_event.set()
+
+    def cancel(self):
+        if self.is_alive():
+            self.state = JOB_CANCELLING
+            self.cancel_event.set()
+            self.resume_event.set() # Wake a paused worker so it sees the cancel
+
+    def status(self):
+        return {"label": self.label, "state": self.state, "error": self.error, "result": self.result, **self.progress.snapshot()}
+
+class JobRunner:
+    # One per server process and tool: the logged-in driver plus the current (or last) job
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.driver = None
+        self.driver_options = {} # initialize_driver() flags the driver was started with
+        self.job = None
+
+    def busy(self):
+        return self.job is not None and self.job.is_alive()
+
+    def start(self, label, work, progress):
+        with self.lock:
+            if self.busy():
+                raise RuntimeError(f"A cleanup job is already running: {self.job.label}")
+            self.job = CleanupJob(label, work, progress)
+            self.job.start()
+            return self.job
+
+    def dismiss(self):
+        with self.lock:
+            if not self.busy():
+                self.job = None
+
+    def close_driver(self):
+        with self.lock:
+            if self.busy():
+                raise RuntimeError("Cancel the running job before closing the browser.")
+            if self.driver:
+                self.driver.quit()
+            self.driver = None
+
+def shared_runner(name):
+    import streamlit as st
+    return st.cache_resource(show_spinner=False)(JobRunner)(name)
+
+def render_job_panel(runner, poll_interval=STATUS_POLL_INTERVAL):
+    # Polls the job from a fragment, so only this panel reruns every poll_interval seconds
+    import streamlit as st
+    from progress import StreamlitProgressView
+
+    @st.fragment(run_every=poll_interval)
+    def panel():
+        job = runner.job
+        if job is None:
+            return
+        status = job.status()
+        st.subheader(f"{job.label}: {status['state']}")
+        StreamlitProgressView().render(status)
+        if job.is_alive():
+            pause_col, cancel_col = st.columns(2)
+            if status["state"] == JOB_PAUSED:
+                pause_col.button("▶️ Resume", on_click=job.resume, key="job_resume")
+            else:
+                pause_col.button("⏸️ Pause", on_click=job.pause, key="job_pause", disabled=status["state"] == JOB_CANCELLING)
+            cancel_col.button("⏹️ Cancel", on_click=job.cancel, key="job_cancel", disabled=status["state"] == JOB_CANCELLING)
+            return
+        if status["state"] == JOB_FINISHED:
+            st.success(f"🎉 {job.label}: finished!")
+        elif status["state"] == JOB_CANCELLED:
+            st.warning(f"{job.label}: cancelled. Items handled so far are kept in the checkpoint.")
+        elif status["error"]:
+            st.error(f"Job failed: {status['error']}")
+        for name, value in (status["result"] or {}).items():
+            st.write(f"{name}: {value}")
+        if st.button("Dismiss", key="job_dismiss"):
+            runner.dismiss()
+            st.rerun() # Full rerun so the start controls come back
+
+    panel()
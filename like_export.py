@@ -0,0 +1,58 @@
+# Append-only JSONL record of the likes a sweep removes (status id, author, tweet time, text
+# preview), written as delete_likes goes: an audit trail, and the list to re-like from if a run
+# has to be undone. Records go straight to the file, so memory stays flat however long the run;
+# buffered lines are flushed every FLUSH_EVERY records or FLUSH_INTERVAL seconds, whichever
+# comes first. A ".gz" path is written gzip-compressed; every run appends a new gzip member,
+# which gzip.open() / zcat read back as one stream.
+import gzip
+import json
+import time
+
+from extractor import handle_from_href
+
+LIKES_EXPORT_FILE = "unliked_tweets.jsonl"
+FLUSH_EVERY = 50
+FLUSH_INTERVAL = 5.0 # Seconds
+TEXT_PREVIEW_CHARS = 280
+
+class JsonlExport:
+    def __init__(self, path=LIKES_EXPORT_FILE, flush_every=FLUSH_EVERY, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        if path.endswith(".gz"):
+            self.file = gzip.open(path, "at", encoding="utf-8")
+        else:
+            self.file = open(path, "a", encoding="utf-8")
+        self.written = 0
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.written += 1
+        self.pending += 1
+        if self.pending >= self.flush_every or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.file.flush() # A gzip sync flush: everything written so far can be decompressed
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+def like_record(article, outcome):
+    # One line per handled like; only the article's plain fields, never its WebElements
+    return {
+        "status_id": article["status_id"],
+        "author": handle_from_href(article["href"]),
+        "url": article["href"],
+        "timestamp": article["timestamp"],
+        "text": (article.get("text") or article["text_preview"])[:TEXT_PREVIEW_CHARS],
+        "outcome": outcome,
+        "handled_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
@@ -1,55 +1,23 @@
 import streamlit as st
 import os
-import json
 import time
 import random
 from datetime import datetime, timedelta
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
-from webdriver_manager.chrome import ChromeDriverManager
 
-COOKIE_FILE = "twitter_cookies.json"
+from selector_cache import selector_registry
+from session_core import COOKIE_FILE, cached_driver_factory, initialize_driver, start_session
 
-def configure_chrome_options():
-    options = Options()
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option("useAutomationExtension", False)
-    return options
-
-def initialize_driver():
-    options = configure_chrome_options()
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
-
-def load_cookies(driver, cookie_file):
-    with open(cookie_file, "r") as f:
-        cookies = json.load(f)
-    driver.get("https://x.com/")
-    for cookie in cookies:
-        cookie.pop('sameSite', None)
-        if 'expiry' in cookie:
-            cookie['expiry'] = int(cookie['expiry'])
-        try:
-            driver.add_cookie(cookie)
-        except Exception:
-            pass
-
-def is_logged_in(driver):
-    driver.get("https://x.com/home")
-    time.sleep(3)
-    return "Home / X" in driver.title or "profile" in driver.page_source.lower()
+LIKE_BUTTON_SELECTORS = [
+    './/button[@data-testid="like"]', # Using data-testid="like" as primary selector
+    './/button[contains(@aria-label, "Like")]', # Fallback to aria-label containing "Like"
+    # Fallback to SVG with known path data
+    './/button[.//path[@d="M16.697 5.5c-1.222-.06-2.679.51-3.89 2.16l-.805 1.09-.806-1.09C9.984 6.01 8.526 5.44 7.304 5.5c-1.243.07-2.349.78-2.91 1.91-.552 1.12-.633 2.78.479 4.82 1.074 1.97 3.257 4.27 7.129 6.61 3.87-2.34 6.052-4.64 7.126-6.61 1.111-2.04 1.03-3.7.477-4.82-.561-1.13-1.666-1.84-2.908-1.91zm4.187 7.69c-1.351 2.48-4.001 5.12-8.379 7.67l-.503.3-.504-.3c-4.379-2.55-7.029-5.19-8.382-7.67-1.36-2.5-1.41-4.86-.514-6.67.887-1.79 2.647-2.91 4.601-3.01 1.651-.09 3.368.56 4.798 2.01 1.429-1.45 3.146-2.1 4.796-2.01 1.954.1 3.714 1.22 4.601 3.01.896 1.81.846 4.17-.514 6.67z"]]',
+]
 
 def perform_likes(driver, search_query, like_count):
     # Calculate date range for recent tweets (last 10 days)
@@ -121,23 +89,14 @@ def perform_likes(driver, search_query, like_count):
                 except:
                     pass
                 
-                # NEW: Target the like button using multiple reliable attributes
-                try:
-                    # Using data-testid="like" as primary selector
-                    like_button = tweet.find_element(By.XPATH, './/button[@data-testid="like"]')
-                except:
-                    try:
-                        # Fallback to aria-label containing "Like"
-                        like_button = tweet.find_element(By.XPATH, './/button[contains(@aria-label, "Like")]')
-                    except:
-                        try:
-                            # Fallback to SVG with known path data
-                            like_button = tweet.find_element(
-                                By.XPATH, 
-                                './/button[.//path[@d="M16.697 5.5c-1.222-.06-2.679.51-3.89 2.16l-.805 1.09-.806-1.09C9.984 6.01 8.526 5.44 7.304 5.5c-1.243.07-2.349.78-2.91 1.91-.552 1.12-.633 2.78.479 4.82 1.074 1.97 3.257 4.27 7.129 6.61 3.87-2.34 6.052-4.64 7.126-6.61 1.111-2.04 1.03-3.7.477-4.82-.561-1.13-1.666-1.84-2.908-1.91zm4.187 7.69c-1.351 2.48-4.001 5.12-8.379 7.67l-.503.3-.504-.3c-4.379-2.55-7.029-5.19-8.382-7.67-1.36-2.5-1.41-4.86-.514-6.67.887-1.79 2.647-2.91 4.601-3.01 1.651-.09 3.368.56 4.798 2.01 1.429-1.45 3.146-2.1 4.796-2.01 1.954.1 3.714 1.22 4.601 3.01.896 1.81.846 4.17-.514 6.67z"]]'
-                            )
-                        except:
-                            continue
+                # NEW: Target the like button using multiple reliable attributes, in ranked order
+                # (the variant that matched last is tried first, see selector_cache.py)
+                like_button = selector_registry().find(
+                    "like_button", LIKE_BUTTON_SELECTORS,
+                    lambda sel: next(iter(tweet.find_elements(By.XPATH, sel)), None),
+                )
+                if like_button is None:
+                    continue
                 
                 # Only include if visible and clickable
                 if like_button.is_displayed() and like_button.is_enabled():
@@ -233,16 +192,14 @@ def main():
         if st.button("Start Session with Cookies"):
             with st.spinner("Launching browser and loading cookies..."):
                 try:
-                    driver = initialize_driver()
-                    load_cookies(driver, COOKIE_FILE)
-                    driver.get("https://x.com/home")
-                    time.sleep(3)
+                    driver = initialize_driver(cached_driver_factory())
+                    logged_in = start_session(driver, COOKIE_FILE)
                     
                     # Take screenshot for debugging
                     driver.save_screenshot("login_check.png")
                     st.image("login_check.png", caption="Browser View", use_column_width=True)
                     
-                    if is_logged_in(driver):
+                    if logged_in:
                         st.success("Logged in with cookies! 🎉")
                         st.session_state.logged_in = True
                         st.session_state.driver = driver
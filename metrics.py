@@ -0,0 +1,196 @@
+# Hot-path instrumentation for the cleanup tools. Each run records a latency histogram per
+# phase (hover, finding "More", menu render, confirm, post-delete settle, scroll, unlike, ...)
+# and a histogram of WebDriver commands per item, then writes a JSON run report plus a
+# Prometheus text-format file for the node exporter's textfile collector.
+import collections
+import contextlib
+import json
+import os
+import threading
+import time
+
+METRICS_REPORT = "cleanup_metrics_{tool}.json"
+PROMETHEUS_FILE = "cleanup_metrics_{tool}.prom" # One file per tool, so runs of the two tools don't overwrite each other
+PHASE_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COMMAND_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+class CommandCounter:
+    # Counts every WebDriver HTTP command by wrapping the driver's command executor, in total and
+    # per calling thread (a pipelined run drives its two browsers from two threads)
+    def __init__(self, driver):
+        self.count = 0
+        self.by_thread = collections.Counter()
+        self.lock = threading.Lock()
+        self.executor = driver.command_executor
+        self.original_execute = self.executor.execute
+
+        def execute(command, params):
+            with self.lock:
+                self.count += 1
+                self.by_thread[threading.get_ident()] += 1
+            return self.original_execute(command, params)
+
+        self.executor.execute = execute
+
+    def detach(self):
+        self.executor.execute = self.original_execute
+
+class Histogram:
+    # Prometheus-style histogram: fixed upper bounds plus an implicit +Inf bucket
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation (the max for the +Inf bucket)
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return round(min(bound, self.max), 4)
+        return round(self.max, 4)
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "mean": round(self.sum / self.count, 4) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": round(self.max, 4),
+            "buckets": {str(b): n for b, n in zip(self.buckets + ("+Inf",), self.counts)},
+        }
+
+class RunMetrics:
+    def __init__(self, tool="cleanup"):
+        self.tool = tool
+        self.lock = threading.Lock()
+        self.phases = {}
+        self.item_commands = Histogram(COMMAND_BUCKETS)
+        self.commands = {} # Browser label -> CommandCounter
+        self.started = time.time()
+
+    def attach(self, driver, label="main"):
+        # Start counting the WebDriver commands of one browser (a pipelined run attaches its
+        # deleting browser as "worker"); detach() restores the executors
+        if label in self.commands:
+            self.commands.pop(label).detach()
+        self.commands[label] = CommandCounter(driver)
+
+    def detach(self):
+        for counter in self.commands.values():
+            counter.detach()
+
+    def thread_commands(self):
+        # Commands the calling thread sent so far, over every attached browser
+        ident = threading.get_ident()
+        return sum(counter.by_thread[ident] for counter in list(self.commands.values()))
+
+    def observe(self, phase, seconds):
+        with self.lock:
+            if phase not in self.phases:
+                self.phases[phase] = Histogram(PHASE_BUCKETS)
+            self.phases[phase].observe(seconds)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    @contextlib.contextmanager
+    def item(self):
+        # One deletion/unlike attempt: total time plus the WebDriver commands it took. Counted for
+        # the calling thread only, so a scan running alongside in another thread isn't included.
+        commands_before = self.thread_commands() if self.commands else None
+        with self.phase("item"):
+            try:
+                yield
+            finally:
+                if commands_before is not None:
+                    with self.lock:
+                        self.item_commands.observe(self.thread_commands() - commands_before)
+
+    def report(self, counts=None):
+        with self.lock:
+            return {
+                "tool": self.tool,
+                "started": self.started,
+                "duration_s": round(time.time() - self.started, 3),
+                "counts": counts or {},
+                "webdriver_commands": sum(c.count for c in self.commands.values()) if self.commands else None,
+                "webdriver_commands_by_browser": {label: c.count for label, c in self.commands.items()},
+                "commands_per_item": self.item_commands.to_dict(),
+                "phases_s": {name: h.to_dict() for name, h in sorted(self.phases.items())},
+            }
+
+    def prometheus_text(self, counts=None):
+        labels = f'tool="{self.tool}"'
+        lines = [
+            "# HELP x_cleanup_phase_seconds Time spent per cleanup phase.",
+            "# TYPE x_cleanup_phase_seconds histogram",
+        ]
+        with self.lock:
+            for name, h in sorted(self.phases.items()):
+                lines += _histogram_lines("x_cleanup_phase_seconds", f'{labels},phase="{name}"', h)
+            lines += [
+                "# HELP x_cleanup_item_webdriver_commands WebDriver commands per deleted/unliked item.",
+                "# TYPE x_cleanup_item_webdriver_commands histogram",
+            ]
+            lines += _histogram_lines("x_cleanup_item_webdriver_commands", labels, self.item_commands)
+        lines += [
+            "# HELP x_cleanup_items Items per outcome in the last run.",
+            "# TYPE x_cleanup_items gauge",
+        ]
+        for outcome, n in sorted((counts or {}).items()):
+            lines.append(f'x_cleanup_items{{{labels},outcome="{outcome}"}} {n}')
+        lines += [
+            "# HELP x_cleanup_last_run_duration_seconds Wall time of the last run.",
+            "# TYPE x_cleanup_last_run_duration_seconds gauge",
+            f"x_cleanup_last_run_duration_seconds{{{labels}}} {time.time() - self.started:.3f}",
+            "# HELP x_cleanup_last_run_timestamp_seconds When the last run report was written.",
+            "# TYPE x_cleanup_last_run_timestamp_seconds gauge",
+            f"x_cleanup_last_run_timestamp_seconds{{{labels}}} {time.time():.0f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write_reports(self, counts=None, report_file=METRICS_REPORT, prometheus_file=PROMETHEUS_FILE):
+        if report_file:
+            with open(report_file.format(tool=self.tool), "w") as f:
+                json.dump(self.report(counts), f, indent=2)
+        if prometheus_file:
+            prometheus_file = prometheus_file.format(tool=self.tool)
+            # Write-then-rename so the textfile collector never scrapes a half-written file
+            tmp = f"{prometheus_file}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                f.write(self.prometheus_text(counts))
+            os.replace(tmp, prometheus_file)
+
+def _histogram_lines(metric, labels, h):
+    lines = []
+    cumulative = 0
+    for bound, n in zip(h.buckets + ("+Inf",), h.counts):
+        cumulative += n
+        lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f"{metric}_sum{{{labels}}} {h.sum:.6f}")
+    lines.append(f"{metric}_count{{{labels}}} {h.count}")
+    return lines
@@ -0,0 +1,355 @@
+# Local stand-in for the parts of x.com the cleanup tools touch, for offline benchmarking.
+# It serves a synthetic account whose DOM follows the same contract the tools rely on:
+# article[data-testid="tweet"] with a /status/ permalink and <time>, reply/retweet/like stat
+# buttons, the "caret" More button, role="menu"/"menuitem", confirmationSheetConfirm,
+# like/unlike buttons, the "Profile timelines" nav and infinite-scroll appends.
+# Deletes and unlikes go through /i/api/graphql/<hash>/DeleteTweet|UnfavoriteTweet like the real site.
+#
+#   python mock_x.py --posts 500 --likes 500 --zero-fraction 0.3 --latency-ms 150
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HANDLE = "mockuser"
+TWITTER_EPOCH_MS = 1288834974657
+
+def snowflake(ms, seq=0):
+    return str(((ms - TWITTER_EPOCH_MS) << 22) | seq)
+
+class MockTimeline:
+    def __init__(self, posts=200, likes=200, zero_fraction=0.3, reply_fraction=0.4, seed=1, page_size=10):
+        rng = random.Random(seed)
+        self.page_size = page_size
+        self.lock = threading.Lock()
+        now_ms = int(time.time() * 1000)
+        self.tweets = []
+        for i in range(posts):
+            ms = now_ms - (i + 1) * 3_600_000 - rng.randint(0, 3_599_999)
+            zero = rng.random() < zero_fraction
+            self.tweets.append({
+                "id": snowflake(ms, i % 4096),
+                "handle": HANDLE,
+                "ts": datetime.fromtimestamp(ms / 1000, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "text": f"Synthetic tweet #{i} " + "lorem ipsum " * rng.randint(1, 8),
+                "is_reply": rng.random() < reply_fraction,
+                "replies": 0 if zero else rng.choice([0, 1, 2, 5]),
+                "reposts": 0 if zero else rng.choice([0, 1, 3, 1200]),
+                "likes": 0 if zero else rng.choice([1, 4, 12, 2500]),
+                "liked": False,
+            })
+        self.liked = []
+        for i in range(likes):
+            ms = now_ms - (i + 1) * 1_800_000
+            self.liked.append({
+                "id": snowflake(ms, (i + 2048) % 4096),
+                "handle": f"someone{i % 50}",
+                "ts": datetime.fromtimestamp(ms / 1000, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "text": f"Someone else's tweet #{i} " + "dolor sit amet " * rng.randint(1, 6),
+                "is_reply": False,
+                "replies": rng.choice([0, 3, 40]),
+                "reposts": rng.choice([0, 2, 9]),
+                "likes": rng.choice([1, 30, 1500]),
+                "liked": True,
+            })
+        self.deleted = set()
+        self.unliked = set()
+        self.events = [] # (monotonic time, operation, tweet id, status code) for every mutation
+        self.media_bytes_served = 0
+
+    def tab_items(self, tab):
+        with self.lock:
+            if tab == "likes":
+                return [t for t in self.liked if t["id"] not in self.unliked]
+            items = [t for t in self.tweets if t["id"] not in self.deleted]
+            if tab == "posts":
+                items = [t for t in items if not t["is_reply"]]
+            return items
+
+    def find(self, tweet_id):
+        for t in self.tweets + self.liked:
+            if t["id"] == tweet_id:
+                return t
+        return None
+
+    def zero_engagement_ids(self):
+        return [t["id"] for t in self.tweets if not (t["replies"] or t["reposts"] or t["likes"])]
+
+    def mutate(self, operation, tweet_id):
+        with self.lock:
+            if operation == "DeleteTweet" and any(t["id"] == tweet_id for t in self.tweets) and tweet_id not in self.deleted:
+                self.deleted.add(tweet_id)
+                status = 200
+            elif operation == "UnfavoriteTweet" and tweet_id not in self.unliked:
+                self.unliked.add(tweet_id)
+                status = 200
+            else:
+                status = 404
+            self.events.append((time.monotonic(), operation, tweet_id, status))
+            return status
+
+PAGE = r"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>__TITLE__</title>
+<style>
+body { font-family: sans-serif; margin: 0; }
+nav a { margin-right: 16px; }
+article { border-bottom: 1px solid #ddd; padding: 12px; min-height: 120px; position: relative; }
+article [data-testid="caret"] { position: absolute; right: 12px; top: 12px; cursor: pointer; }
+article button { margin-right: 24px; }
+[role="menu"] { position: fixed; top: 40%; left: 40%; background: #fff; border: 1px solid #999; padding: 8px; z-index: 10; }
+[data-testid="confirmationSheetDialog"] { position: fixed; top: 30%; left: 30%; background: #fff; border: 2px solid #000; padding: 24px; z-index: 20; }
+</style></head>
+<body>
+<header><a href="/home" data-testid="AppTabBar_Home_Link">Home</a>
+<a href="/__HANDLE__" aria-label="Profile" data-testid="AppTabBar_Profile_Link">Profile</a></header>
+<main role="main"><div data-testid="primaryColumn">
+__BODY__
+<section id="timeline" aria-label="Timeline"></section>
+</div></main>
+<script>
+const CFG = __CFG__;
+let cursor = '', loading = false, done = false;
+
+function statButton(testid, count) {
+    const b = document.createElement('button');
+    b.setAttribute('data-testid', testid);
+    b.innerHTML = '<span data-testid="app-text-transition-container"><span></span></span>';
+    b.querySelector('span > span').textContent = count ? formatCount(count) : '';
+    return b;
+}
+function formatCount(n) {
+    if (n >= 1000) return (Math.round(n / 100) / 10) + 'K';
+    return String(n);
+}
+function render(t) {
+    const a = document.createElement('article');
+    a.setAttribute('data-testid', 'tweet');
+    a.dataset.id = t.id;
+    const head = document.createElement('div');
+    head.innerHTML = '<span>@' + t.handle + '</span> <a></a>';
+    head.querySelector('a').href = '/' + t.handle + '/status/' + t.id;
+    head.querySelector('a').innerHTML = '<time></time>';
+    head.querySelector('time').setAttribute('datetime', t.ts);
+    head.querySelector('time').textContent = t.ts.slice(0, 10);
+    a.appendChild(head);
+    if (t.is_reply) {
+        const r = document.createElement('div');
+        r.textContent = 'Replying to @someone';
+        a.appendChild(r);
+    }
+    const text = document.createElement('div');
+    text.setAttribute('data-testid', 'tweetText');
+    text.textContent = t.text;
+    a.appendChild(text);
+    if (CFG.media) {
+        const img = document.createElement('img');
+        img.src = '/mock_media/' + t.id + '.jpg';
+        img.width = 500; img.height = 280;
+        a.appendChild(img);
+        const video = document.createElement('video');
+        video.src = '/mock_media/' + t.id + '.mp4';
+        video.autoplay = true; video.muted = true; video.loop = true;
+        a.appendChild(video);
+    }
+    const caret = document.createElement('div');
+    caret.setAttribute('data-testid', 'caret');
+    caret.setAttribute('role', 'button');
+    caret.setAttribute('aria-label', 'More');
+    caret.setAttribute('tabindex', '0');
+    caret.textContent = '⋯';
+    a.appendChild(caret);
+    const group = document.createElement('div');
+    group.setAttribute('role', 'group');
+    group.appendChild(statButton('reply', t.replies));
+    group.appendChild(statButton('retweet', t.reposts));
+    group.appendChild(statButton(t.liked ? 'unlike' : 'like', t.likes));
+    a.appendChild(group);
+    return a;
+}
+async function loadMore() {
+    if (loading || done || !CFG.tab) return;
+    loading = true;
+    const r = await fetch('/api/timeline?tab=' + CFG.tab + '&cursor=' + cursor);
+    const data = await r.json();
+    const tl = document.getElementById('timeline');
+    for (const t of data.items) tl.appendChild(render(t));
+    cursor = data.next;
+    done = data.next === null;
+    loading = false;
+}
+function maybeLoad() {
+    if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 800) loadMore();
+}
+async function graphql(op, id) {
+    const r = await fetch('/i/api/graphql/mOcKhAsH/' + op, {method: 'POST', headers: {'content-type': 'application/json'}, body: JSON.stringify({variables: {tweet_id: id}})});
+    return r.ok;
+}
+function closeMenus() {
+    document.querySelectorAll('[role="menu"]').forEach(m => m.remove());
+}
+document.addEventListener('click', async (ev) => {
+    const el = ev.target;
+    const caret = el.closest('[data-testid="caret"]');
+    if (caret) {
+        closeMenus();
+        const article = caret.closest('article');
+        const menu = document.createElement('div');
+        menu.setAttribute('role', 'menu');
+        menu.innerHTML = '<div role="menuitem" tabindex="0"><span>Delete</span></div><div role="menuitem" tabindex="0"><span>Pin to your profile</span></div>';
+        menu.dataset.id = article.dataset.id;
+        setTimeout(() => document.body.appendChild(menu), CFG.ui_latency_ms);
+        return;
+    }
+    const item = el.closest('[role="menuitem"]');
+    if (item) {
+        const id = item.closest('[role="menu"]').dataset.id;
+        closeMenus();
+        if (item.textContent.trim() === 'Delete') {
+            const sheet = document.createElement('div');
+            sheet.setAttribute('data-testid', 'confirmationSheetDialog');
+            sheet.innerHTML = '<div>Delete post?</div><div data-testid="confirmationSheetConfirm" role="button">Delete</div><div data-testid="confirmationSheetCancel" role="button">Cancel</div>';
+            sheet.dataset.id = id;
+            setTimeout(() => document.body.appendChild(sheet), CFG.ui_latency_ms);
+        }
+        return;
+    }
+    const sheet = el.closest('[data-testid="confirmationSheetDialog"]');
+    if (sheet) {
+        const id = sheet.dataset.id;
+        sheet.remove();
+        if (el.closest('[data-testid="confirmationSheetConfirm"]') && await graphql('DeleteTweet', id)) {
+            const a = document.querySelector('article[data-id="' + id + '"]');
+            if (a) a.remove();
+        }
+        return;
+    }
+    const unlike = el.closest('button[data-testid="unlike"]');
+    if (unlike) {
+        const id = unlike.closest('article').dataset.id;
+        if (await graphql('UnfavoriteTweet', id)) unlike.setAttribute('data-testid', 'like');
+        return;
+    }
+    closeMenus();
+});
+window.addEventListener('scroll', maybeLoad);
+if (CFG.status) {
+    document.getElementById('timeline').appendChild(render(CFG.status));
+} else {
+    loadMore();
+    setInterval(maybeLoad, 250); // Deletions shrink the page without a scroll event
+}
+</script></body></html>
+"""
+
+TABS = (("Posts", "posts", f"/{HANDLE}"), ("Replies", "replies", f"/{HANDLE}/with_replies"), ("Likes", "likes", f"/{HANDLE}/likes"))
+
+def profile_nav(selected):
+    links = "".join(
+        f'<a href="{path}" role="tab" aria-selected="{"true" if key == selected else "false"}"><span>{label}</span></a>'
+        for label, key, path in TABS
+    )
+    return f'<h2>Mock User</h2><nav aria-label="Profile timelines" role="navigation">{links}</nav>'
+
+def make_handler(timeline, latency_ms=0, ui_latency_ms=50, media_kb=0):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def send(self, status, body, content_type="text/html; charset=utf-8"):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def page(self, title, body="", tab=None, status=None):
+            cfg = {"tab": tab, "status": status, "ui_latency_ms": ui_latency_ms, "media": media_kb > 0}
+            html = PAGE.replace("__TITLE__", title).replace("__HANDLE__", HANDLE).replace("__BODY__", body).replace("__CFG__", json.dumps(cfg))
+            self.send(200, html)
+
+        def do_GET(self):
+            time.sleep(latency_ms / 1000)
+            url = urlparse(self.path)
+            path = url.path.rstrip("/") or "/"
+            if path in ("/", "/home"):
+                return self.page("Home / X", '<section><h1>Home</h1></section>')
+            for label, key, tab_path in TABS:
+                if path == tab_path:
+                    return self.page("Mock User / X", profile_nav(key), tab=key)
+            if path == "/api/timeline":
+                query = parse_qs(url.query)
+                items = timeline.tab_items(query.get("tab", ["posts"])[0])
+                # Cursor is the last id already shown (items are newest first), so deletions don't shift pages
+                cursor = query.get("cursor", [""])[0]
+                if cursor:
+                    items = [t for t in items if int(t["id"]) < int(cursor)]
+                page = items[:timeline.page_size]
+                next_cursor = page[-1]["id"] if len(items) > len(page) else None
+                return self.send(200, json.dumps({"items": page, "next": next_cursor}), "application/json")
+            if path.startswith("/mock_media/"):
+                # Opaque filler bytes: enough to measure what lean mode saves in bandwidth and requests
+                body = b"\0" * (media_kb * 1024)
+                with timeline.lock:
+                    timeline.media_bytes_served += len(body)
+                self.send_response(200)
+                self.send_header("Content-Type", "video/mp4" if path.endswith(".mp4") else "image/jpeg")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            if path.startswith("/i/web/status/") or "/status/" in path:
+                tweet_id = path.rsplit("/", 1)[-1]
+                tweet = timeline.find(tweet_id)
+                if tweet is None or tweet_id in timeline.deleted:
+                    return self.page("Page not found / X", "<div>Hmm...this page doesn’t exist. Try searching for something else.</div>")
+                return self.page("Post / X", status=tweet)
+            self.send(404, "not found", "text/plain")
+
+        def do_POST(self):
+            time.sleep(latency_ms / 1000)
+            path = urlparse(self.path).path
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            operation = path.rsplit("/", 1)[-1]
+            if path.startswith("/i/api/graphql/") and operation in ("DeleteTweet", "UnfavoriteTweet"):
+                status = timeline.mutate(operation, payload.get("variables", {}).get("tweet_id"))
+                return self.send(status, json.dumps({"data": {}}), "application/json")
+            self.send(404, "not found", "text/plain")
+
+    return Handler
+
+def start_server(timeline, port=0, latency_ms=0, ui_latency_ms=50, media_kb=0):
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(timeline, latency_ms, ui_latency_ms, media_kb))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a synthetic X timeline for offline benchmarking.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--posts", type=int, default=200, help="Own tweets (Posts + Replies)")
+    parser.add_argument("--likes", type=int, default=200, help="Liked tweets on the Likes tab")
+    parser.add_argument("--zero-fraction", type=float, default=0.3, help="Share of own tweets with 0 engagement")
+    parser.add_argument("--reply-fraction", type=float, default=0.4, help="Share of own tweets that are replies")
+    parser.add_argument("--page-size", type=int, default=10, help="Articles appended per infinite-scroll load")
+    parser.add_argument("--latency-ms", type=int, default=0, help="Injected server latency per request")
+    parser.add_argument("--ui-latency-ms", type=int, default=50, help="Injected delay before menus/dialogs render")
+    parser.add_argument("--media-kb", type=int, default=0, help="Attach an image and an autoplay video of this size to every article")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    timeline = MockTimeline(args.posts, args.likes, args.zero_fraction, args.reply_fraction, args.seed, args.page_size)
+    server, base_url = start_server(timeline, args.port, args.latency_ms, args.ui_latency_ms, args.media_kb)
+    print(f"Mock X serving {args.posts} tweets / {args.likes} likes at {base_url}/home (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
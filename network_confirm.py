@@ -0,0 +1,148 @@
+# Server-side confirmation of deletes and unlikes. Chrome's performance log (enabled with the
+# goog:loggingPrefs capability in session_core.configure_chrome_options) carries the DevTools
+# Network events, so the DeleteTweet/UnfavoriteTweet GraphQL response itself is the completion
+# signal: a 2xx without GraphQL "errors" is a success, anything else is recorded as a failure.
+# When the log isn't available (a driver started without the capability), callers get None and
+# fall back to watching the DOM. Status codes and rate-limit headers of each answer are kept
+# for the pacing controller (pacing.py).
+import json
+import time
+import weakref
+
+from selenium.common.exceptions import WebDriverException
+
+from waits import POLL_INTERVAL
+
+DELETE_TWEET = "DeleteTweet"
+UNFAVORITE_TWEET = "UnfavoriteTweet"
+MUTATIONS = (DELETE_TWEET, UNFAVORITE_TWEET)
+RATE_LIMIT_STATUS = 429
+RATE_LIMIT_ERROR_CODES = (88, 344) # "Rate limit exceeded", "daily limit" in GraphQL error bodies
+
+def enable_network_log(options):
+    # Network events only; page/timeline events would just make every get_log() call bigger
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    return options
+
+def _operation(url):
+    if "/graphql/" in url:
+        operation = url.split("?", 1)[0].rsplit("/", 1)[-1]
+        if operation in MUTATIONS:
+            return operation
+    return None
+
+def _response_details(response, errors):
+    # What the pacing controller needs from one mutation response
+    headers = {k.lower(): v for k, v in (response.get("headers") or {}).items()}
+    status = response.get("status", 0)
+    details = {
+        "ok": 200 <= status < 300 and not errors,
+        "status": status,
+        "rate_limited": status == RATE_LIMIT_STATUS or any(e.get("code") in RATE_LIMIT_ERROR_CODES for e in errors),
+        "remaining": None,
+        "reset_in": None,
+    }
+    try:
+        details["remaining"] = int(headers["x-rate-limit-remaining"])
+        details["reset_in"] = max(0.0, int(headers["x-rate-limit-reset"]) - time.time())
+    except (KeyError, ValueError):
+        pass
+    return details
+
+class MutationWatcher:
+    def __init__(self):
+        self.available = True
+        self.requests = {} # DevTools requestId -> (operation, tweet_id)
+        self.results = {} # (operation, tweet_id) -> response details; tweet_id is None if the body wasn't logged
+        self.last = None # Details of the last response handed out by wait_for()
+
+    def drain(self, driver):
+        # get_log() hands back (and clears) everything logged since the last call
+        try:
+            entries = driver.get_log("performance")
+        except WebDriverException:
+            self.available = False
+            return
+        for entry in entries:
+            message = entry.get("message", "")
+            # Cheap substring filter before parsing: only our mutations and their outcomes matter
+            if "graphql" not in message and not (self.requests and ("Network.loadingFailed" in message or "Network.responseReceived" in message)):
+                continue
+            event = json.loads(message).get("message", {})
+            method, params = event.get("method"), event.get("params", {})
+            if method == "Network.requestWillBeSent":
+                operation = _operation(params.get("request", {}).get("url", ""))
+                if operation:
+                    try:
+                        tweet_id = json.loads(params["request"].get("postData") or "{}").get("variables", {}).get("tweet_id")
+                    except ValueError:
+                        tweet_id = None
+                    self.requests[params["requestId"]] = (operation, tweet_id)
+            elif method == "Network.responseReceived" and params.get("requestId") in self.requests:
+                key = self.requests.pop(params["requestId"])
+                response = params.get("response", {})
+                errors = self.graphql_errors(driver, params["requestId"]) if 200 <= response.get("status", 0) < 300 else []
+                self.results[key] = _response_details(response, errors)
+            elif method == "Network.loadingFailed" and params.get("requestId") in self.requests:
+                self.results[self.requests.pop(params["requestId"])] = _response_details({}, [])
+
+    def graphql_errors(self, driver, request_id):
+        # X can answer 200 with {"errors": [...]}; the body may not be retrievable yet, in which case
+        # the status code stands
+        try:
+            body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id}).get("body", "")
+            return json.loads(body).get("errors") or []
+        except Exception:
+            return []
+
+    def wait_for(self, driver, operation, tweet_id, timeout=10):
+        # True/False once the server answered the mutation for tweet_id, False if no request went out
+        # before the timeout, None if the network log isn't available
+        deadline = time.monotonic() + timeout
+        while True:
+            self.drain(driver)
+            if not self.available:
+                return None
+            for key in list(self.results):
+                # Without an id on either side, any answer for the operation will do
+                if key[0] == operation and (tweet_id is None or key[1] in (tweet_id, None)):
+                    self.last = self.results.pop(key)
+                    return self.last["ok"]
+            if time.monotonic() >= deadline:
+                self.last = None
+                return False
+            time.sleep(POLL_INTERVAL)
+
+_watchers = weakref.WeakKeyDictionary()
+
+def confirm_mutation(driver, operation, tweet_id, timeout=10):
+    # One watcher per driver, so responses drained while waiting for one item aren't lost to the next
+    watcher = _watchers.get(driver)
+    if watcher is None:
+        watcher = _watchers[driver] = MutationWatcher()
+    if not watcher.available:
+        return None
+    return watcher.wait_for(driver, operation, tweet_id, timeout)
+
+def discard_network_log(driver):
+    # Chrome keeps performance log entries until they are read. A browser that scans without
+    # deleting (the scanning side of a pipelined run, a preview, a walk with few matches) would
+    # hold every Network event of the walk, so the walks empty the log once per scroll pass.
+    # Mutations are always awaited before the walk moves on, so nothing pending is lost.
+    watcher = _watchers.get(driver)
+    if watcher is not None and not watcher.available:
+        return
+    try:
+        driver.get_log("performance")
+    except WebDriverException:
+        pass
+
+def last_mutation_response(driver):
+    # Status/rate-limit details of the response behind the last confirm_mutation() result, or None.
+    # Consumed on read, so an item that failed before sending anything doesn't inherit the last answer.
+    watcher = _watchers.get(driver)
+    if watcher is None:
+        return None
+    last, watcher.last = watcher.last, None
+    return last
@@ -0,0 +1,79 @@
+# Adaptive pacing for deletes and unlikes, shared by delete_empty_tweets_in_tab,
+# delete_tweets_by_id and delete_likes. Starts at full speed (no delay between items) and
+# adjusts from what X answers:
+#   - a 429 / rate-limit error backs off hard and waits out the advertised reset when known
+#   - a high failure rate over the recent window backs off gradually
+#   - once x-rate-limit-remaining runs low, the rest of the budget is spread over the window
+#   - a run of successes ramps the delay back down towards the minimum
+import collections
+import time
+
+MIN_INTERVAL = 0.0 # Seconds between mutations when nothing is signalled
+MAX_INTERVAL = 900.0
+BACKOFF_FLOOR = 2.0 # The first backoff step from full speed
+FAILURE_WINDOW = 20
+FAILURE_THRESHOLD = 0.3 # Back off once more than this share of the recent window failed
+RAMP_AFTER = 5 # Consecutive successes before the delay is halved
+LOW_BUDGET = 20 # Below this many remaining calls, spread them over the rest of the rate-limit window
+
+class PacingController:
+    def __init__(self, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL, window=FAILURE_WINDOW,
+                 failure_threshold=FAILURE_THRESHOLD, ramp_after=RAMP_AFTER):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.failure_threshold = failure_threshold
+        self.ramp_after = ramp_after
+        self.interval = min_interval
+        self.outcomes = collections.deque(maxlen=window)
+        self.streak = 0
+        self.next_at = 0.0
+        self.rate_limited = 0 # How many times X signalled a limit this run
+
+    def wait(self, progress=None):
+        # Sleeps until the next mutation is due, in short slices so a paused/cancelled job reacts
+        while True:
+            delay = self.next_at - time.monotonic()
+            if delay <= 0:
+                return
+            time.sleep(min(delay, 0.5))
+            if progress:
+                progress.checkpoint()
+
+    def backoff(self, factor):
+        self.interval = min(self.max_interval, max(self.interval * factor, BACKOFF_FLOOR))
+
+    def record(self, ok, response=None, progress=None):
+        # Feed one outcome (plus the network_confirm response details, if any). Returns True if X
+        # signalled a rate limit, i.e. the item is worth retrying once the pause is over.
+        now = time.monotonic()
+        response = response or {}
+        self.outcomes.append(bool(ok))
+        if response.get("rate_limited"):
+            self.rate_limited += 1
+            self.streak = 0
+            self.backoff(2)
+            pause = max(self.interval, min(response.get("reset_in") or 0, self.max_interval))
+            self.next_at = now + pause
+            if progress:
+                progress.warning(f"X signalled a rate limit (HTTP {response.get('status')}). Pausing {pause:.0f}s, then continuing at one item per {self.interval:.1f}s.")
+            return True
+
+        if ok:
+            self.streak += 1
+            if self.streak >= self.ramp_after and self.interval > self.min_interval:
+                self.streak = 0
+                self.interval = self.interval / 2 if self.interval / 2 >= 0.1 else self.min_interval
+        else:
+            self.streak = 0
+            failures = self.outcomes.count(False)
+            if len(self.outcomes) >= 5 and failures / len(self.outcomes) > self.failure_threshold:
+                self.backoff(1.5)
+                if progress:
+                    progress.warning(f"{failures}/{len(self.outcomes)} recent attempts failed. Slowing to one item per {self.interval:.1f}s.")
+
+        # Near the end of the server's budget, spend what's left evenly over the rest of its window
+        if response.get("remaining") is not None and response["remaining"] < LOW_BUDGET and response.get("reset_in"):
+            spread = response["reset_in"] / max(response["remaining"], 1)
+            self.interval = min(self.max_interval, max(self.interval, spread))
+        self.next_at = now + self.interval
+        return False
@@ -0,0 +1,144 @@
+# Bounded progress surface for long cleanup runs. Instead of one Streamlit element per log
+# line, a run keeps live counters and the last few log lines in memory, streams the full log
+# to a file and redraws a fixed set of placeholders (progress bar, counters, log tail) at most
+# once per render interval. Streamlit is only imported by the view, so the reporter itself
+# also works headless (benchmark, CLI) and from a worker thread (jobs.py), where the UI
+# polls snapshot() instead of attaching a view.
+import collections
+import threading
+import time
+
+from checkpoint import DELETED, FAILED, KEPT
+from metrics import RunMetrics
+
+LOG_FILE = "cleanup.log"
+LOG_TAIL_LINES = 30
+RENDER_INTERVAL = 1.0 # Seconds between redraws of the Streamlit placeholders
+COUNTERS = ("scanned", "matched", "deleted", "skipped", "failed") # matched: selected by the rules (rules.py)
+VERDICT_COUNTERS = {DELETED: "deleted", KEPT: "skipped", FAILED: "failed"}
+
+class RunProgress:
+    def __init__(self, log_file=LOG_FILE, tail_lines=LOG_TAIL_LINES, render_interval=RENDER_INTERVAL, view=None, total=None, metrics=None):
+        self.lock = threading.Lock()
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.tail = collections.deque(maxlen=tail_lines)
+        self.total = total
+        self.view = view
+        self.render_interval = render_interval
+        self.started = time.monotonic()
+        self.last_render = 0.0
+        self.gate = None # Set by a background job to pause/cancel the run between items
+        self.metrics = metrics or RunMetrics() # Per-phase timings, see metrics.py
+        # Line-buffered append, so the file is complete up to the last line even if the run dies
+        self.file = open(log_file, "a", encoding="utf-8", buffering=1) if log_file else None
+        if self.file:
+            self.file.write(f"===== Run started {time.strftime('%Y-%m-%d %H:%M:%S')} =====\n")
+
+    def log(self, message, level="info"):
+        line = f"{time.strftime('%H:%M:%S')} {level.upper():<7} {message}"
+        with self.lock:
+            if self.file:
+                self.file.write(line + "\n")
+            if level != "debug": # Step-by-step detail only goes to the file
+                self.tail.append(line)
+        self.maybe_render()
+
+    # Same names as the st.* calls they replace
+    def debug(self, message):
+        self.log(message, "debug")
+
+    def write(self, message):
+        self.log(message, "info")
+
+    def info(self, message):
+        self.log(message, "info")
+
+    def success(self, message):
+        self.log(message, "success")
+
+    def warning(self, message):
+        self.log(message, "warning")
+
+    def error(self, message):
+        self.log(message, "error")
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counts[name] += n
+        self.maybe_render()
+
+    def record(self, verdict):
+        self.count(VERDICT_COUNTERS[verdict])
+
+    def checkpoint(self):
+        # Called by the cleanup loops between items
+        if self.gate:
+            self.gate()
+
+    def set_total(self, total):
+        with self.lock:
+            self.total = total
+        self.maybe_render(force=True)
+
+    def counters(self):
+        with self.lock:
+            return dict(self.counts)
+
+    def snapshot(self):
+        with self.lock:
+            counts = dict(self.counts)
+            tail = list(self.tail)
+            total = self.total
+        elapsed = time.monotonic() - self.started
+        done = counts["deleted"] + counts["skipped"] + counts["failed"]
+        return {
+            **counts,
+            "total": total,
+            "done": done,
+            "elapsed_s": round(elapsed, 1),
+            "items_per_minute": round(done / elapsed * 60, 1) if elapsed > 0 else 0.0,
+            "tail": tail,
+        }
+
+    def maybe_render(self, force=False):
+        if self.view is None:
+            return
+        now = time.monotonic()
+        if not force and now - self.last_render < self.render_interval:
+            return
+        self.last_render = now
+        self.view.render(self.snapshot())
+
+    def close(self):
+        self.maybe_render(force=True)
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+class StreamlitProgressView:
+    # A fixed set of placeholders created once; render() overwrites them in place
+    def __init__(self, container=None):
+        import streamlit as st
+
+        container = container or st.container()
+        self.bar = container.progress(0.0)
+        self.metrics = container.empty()
+        self.log = container.empty()
+
+    def render(self, snap):
+        import streamlit as st
+
+        if snap["total"]:
+            fraction = min(snap["done"] / snap["total"], 1.0)
+            text = f"{snap['done']}/{snap['total']} handled"
+        else:
+            fraction = 0.0 # Timeline walks have no known end
+            text = f"{snap['done']} handled"
+        self.bar.progress(fraction, text=f"{text} · {snap['elapsed_s']:.0f}s elapsed")
+        with self.metrics.container():
+            columns = st.columns(len(COUNTERS) + 1)
+            for column, name in zip(columns, COUNTERS):
+                column.metric(name.capitalize(), snap[name])
+            columns[-1].metric("Items/min", snap["items_per_minute"])
+        self.log.code("\n".join(snap["tail"]) or "(no log lines yet)", language=None)
@@ -0,0 +1,141 @@
+# Deletion rules for the tweet cleanup. A rule spec is a plain dict (built by the Streamlit form
+# or the CLI, JSON-serialisable); compile_rules() validates it once per run, compiling the regex
+# and resolving the age cutoffs, and the resulting RuleSet is evaluated over each drained batch of article
+# metadata (extractor.py). Every criterion that is set must hold for an article to match; unset
+# criteria match everything.
+#
+#   {"max_replies": 0, "max_reposts": 0, "max_likes": 0}       # the default: no engagement at all
+#   {"older_than_days": 365, "max_likes": 5, "kind": "replies"} # old replies with at most 5 likes
+import hashlib
+import json
+import re
+from datetime import datetime, timedelta, timezone
+
+from checkpoint import TWEETS
+
+KINDS = ("both", "posts", "replies") # Same names as archive_planner.py --kind
+DEFAULT_RULES = {"max_replies": 0, "max_reposts": 0, "max_likes": 0}
+ENGAGEMENT = (("max_replies", "replies"), ("max_reposts", "reposts"), ("max_likes", "likes"))
+RULE_KEYS = ("older_than_days", "newer_than_days", "max_replies", "max_reposts", "max_likes",
+             "text_contains", "text_regex", "kind", "has_media")
+
+def _posted_at(article):
+    try:
+        return datetime.fromisoformat(article["timestamp"].replace("Z", "+00:00"))
+    except (AttributeError, KeyError, ValueError):
+        return None
+
+class RuleSet:
+    def __init__(self, spec, checks, description, before=None):
+        self.spec = spec
+        self.checks = checks # Cheap, decisive checks first, see compile_rules()
+        self.description = description
+        self.before = before # The "older than" cutoff, if any
+
+    def check(self, article):
+        # True = matches, False = doesn't, None = a criterion couldn't be read (unparseable stats,
+        # no timestamp); a definite miss on any criterion wins over an unreadable one
+        result = True
+        for check in self.checks:
+            outcome = check(article)
+            if outcome is False:
+                return False
+            if outcome is None:
+                result = None
+        return result
+
+    def evaluate(self, articles):
+        return [self.check(article) for article in articles]
+
+    def too_young(self, article):
+        # Not old enough for the age cutoff yet: a later run has to judge it again
+        if self.before is None:
+            return False
+        posted_at = _posted_at(article)
+        return posted_at is None or posted_at >= self.before
+
+    @property
+    def scope(self):
+        # Checkpoint scope: a KEPT verdict only holds for the rules that produced it, so custom
+        # rules get their own scope. Hashed from the spec as given ("older than 30 days", not the
+        # date it resolves to), so a daily run keeps its verdicts and watermark; items still too
+        # young for the cutoff are never settled as KEPT, see too_young().
+        if self.spec == DEFAULT_RULES:
+            return TWEETS
+        digest = hashlib.sha1(json.dumps(self.spec, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{TWEETS}:{digest[:12]}"
+
+def normalize_rules(spec):
+    # Drops unset criteria and validates the rest; raises ValueError with a message fit for the UI
+    spec = dict(spec or {})
+    unknown = set(spec) - set(RULE_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown rule criteria: {', '.join(sorted(unknown))}")
+    rules = {}
+    for key in RULE_KEYS:
+        value = spec.get(key)
+        if value is None or value == "" or (key == "kind" and value == "both"):
+            continue
+        if key in ("older_than_days", "newer_than_days") or key.startswith("max_"):
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{key} must be a whole number, got {value!r}")
+            if value < 0:
+                raise ValueError(f"{key} can't be negative")
+        elif key == "kind" and value not in KINDS:
+            raise ValueError(f"kind must be one of {', '.join(KINDS)}")
+        elif key == "has_media":
+            value = bool(value)
+        elif key == "text_regex":
+            try:
+                re.compile(value)
+            except re.error as e:
+                raise ValueError(f"Invalid text regex {value!r}: {e}")
+        rules[key] = value
+    if "older_than_days" in rules and "newer_than_days" in rules and rules["older_than_days"] >= rules["newer_than_days"]:
+        raise ValueError("older_than_days must be smaller than newer_than_days, or nothing can match")
+    return rules
+
+def compile_rules(spec=None, now=None):
+    spec = normalize_rules(DEFAULT_RULES if spec is None else spec)
+    now = now or datetime.now(timezone.utc)
+    checks = []
+    description = []
+
+    # Free checks on fields the extractor always has first
+    if "kind" in spec:
+        want_reply = spec["kind"] == "replies"
+        checks.append(lambda a: a["is_reply"] == want_reply)
+        description.append(f"{spec['kind']} only")
+    if "has_media" in spec:
+        want_media = spec["has_media"]
+        checks.append(lambda a: a.get("has_media", False) == want_media)
+        description.append("with media" if want_media else "without media")
+
+    for key, field in ENGAGEMENT:
+        if key in spec:
+            limit = spec[key]
+            checks.append(lambda a, field=field, limit=limit: None if a[field] is None else a[field] <= limit)
+            description.append(f"at most {limit} {field}")
+
+    before = None
+    if "older_than_days" in spec:
+        before = (now - timedelta(days=spec["older_than_days"])).replace(hour=0, minute=0, second=0, microsecond=0)
+        checks.append(lambda a: None if _posted_at(a) is None else _posted_at(a) < before)
+        description.append(f"posted before {before:%Y-%m-%d}")
+    if "newer_than_days" in spec:
+        after = (now - timedelta(days=spec["newer_than_days"])).replace(hour=0, minute=0, second=0, microsecond=0)
+        checks.append(lambda a: None if _posted_at(a) is None else _posted_at(a) >= after)
+        description.append(f"posted on/after {after:%Y-%m-%d}")
+
+    if "text_contains" in spec:
+        needle = spec["text_contains"].casefold()
+        checks.append(lambda a: needle in (a.get("text") or "").casefold())
+        description.append(f"text contains {spec['text_contains']!r}")
+    if "text_regex" in spec:
+        pattern = re.compile(spec["text_regex"], re.IGNORECASE)
+        checks.append(lambda a: bool(pattern.search(a.get("text") or "")))
+        description.append(f"text matches /{spec['text_regex']}/")
+
+    return RuleSet(spec, checks, ", ".join(description) or "every item", before)
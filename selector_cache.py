@@ -0,0 +1,95 @@
+# Adaptive ranking for the multi-fallback element lookups ("More" button, profile link, like
+# button). Per element role, the variant that last matched is tried first and variants that
+# keep missing sink to the back, so after a layout change only the first lookup pays for the
+# stale selectors. The ranking is persisted between runs.
+# (Not named selectors.py, which would shadow the stdlib module.)
+import json
+import os
+import threading
+
+SELECTOR_CACHE_FILE = "selector_ranking.json"
+DEMOTE_AFTER = 3 # Consecutive misses before a variant is moved behind the others
+
+class SelectorRegistry:
+    def __init__(self, path=SELECTOR_CACHE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.roles = {} # role -> {"order": [variant, ...], "stats": {variant: {"hits", "misses", "streak"}}}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self.roles = json.load(f)
+            except (OSError, ValueError):
+                self.roles = {} # A corrupt cache only costs the ranking, never the lookup
+
+    def ordered(self, role, variants):
+        # The code's variants in ranked order: known ones as ranked, new ones after them in code order
+        with self.lock:
+            ranked = [v for v in self.roles.get(role, {}).get("order", []) if v in variants]
+            return ranked + [v for v in variants if v not in ranked]
+
+    def _entry(self, role, variants):
+        entry = self.roles.setdefault(role, {"order": [], "stats": {}})
+        entry["order"] = [v for v in entry["order"] if v in variants] + [v for v in variants if v not in entry["order"]]
+        return entry
+
+    def hit(self, role, variants, variant):
+        with self.lock:
+            entry = self._entry(role, variants)
+            stats = entry["stats"].setdefault(variant, {"hits": 0, "misses": 0, "streak": 0})
+            stats["hits"] += 1
+            stats["streak"] = 0
+            changed = entry["order"][0] != variant
+            if changed:
+                entry["order"].remove(variant)
+                entry["order"].insert(0, variant)
+        if changed:
+            self.save()
+
+    def miss(self, role, variants, variant):
+        with self.lock:
+            entry = self._entry(role, variants)
+            stats = entry["stats"].setdefault(variant, {"hits": 0, "misses": 0, "streak": 0})
+            stats["misses"] += 1
+            stats["streak"] += 1
+            changed = stats["streak"] >= DEMOTE_AFTER and entry["order"][-1] != variant
+            if changed:
+                entry["order"].remove(variant)
+                entry["order"].append(variant)
+        if changed:
+            self.save()
+
+    def find(self, role, variants, lookup):
+        # lookup(variant) -> element or None; returns the first match in ranked order. Misses only
+        # count when another variant did match: if none does, the element just isn't there (yet).
+        missed = []
+        for variant in self.ordered(role, variants):
+            found = lookup(variant)
+            if found:
+                for stale in missed:
+                    self.miss(role, variants, stale)
+                self.hit(role, variants, variant)
+                return found
+            missed.append(variant)
+        return None
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            data = json.dumps(self.roles, indent=2)
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def selector_registry():
+    # One registry per process, shared by every tool and thread
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SelectorRegistry()
+        return _registry
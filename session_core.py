@@ -0,0 +1,164 @@
+# Shared driver/session core for all three tools. Selenium and webdriver_manager are imported
+# inside the functions, so they only load when a browser session actually starts and a
+# Streamlit rerun of the UI never pays for them.
+import json
+
+from browser_cache import (
+    PROFILE_DIR, cached_chromedriver_path, drop_persistent_profile, has_auth_cookie, profile_in_use, use_persistent_profile,
+)
+
+COOKIE_FILE = "twitter_cookies.json"
+X_BASE_URL = "https://x.com"
+
+# Lean mode: media and font requests are dropped via CDP. JS/CSS bundles (abs.twimg.com) still load.
+LEAN_BLOCKED_URLS = [
+    "*pbs.twimg.com/*", "*video.twimg.com/*",
+    "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*",
+    "*.mp4*", "*.m3u8*", "*.m4s*",
+    "*.woff*", "*.ttf*", "*.otf*",
+]
+LEAN_WINDOW_SIZE = "1024,768" # X collapses the left nav (but keeps the Profile link) below ~1280px
+
+LOGGED_IN_XPATH = '//div[@data-testid="primaryColumn"]//section[.//h1[contains(text(),"Home")]] | //main[@role="main"]//div[contains(@data-testid,"primaryColumn")]'
+
+def _log(log, message):
+    if log:
+        log(message)
+
+def configure_chrome_options(lean=False, headless=False):
+    from selenium.webdriver.chrome.options import Options
+    from network_confirm import enable_network_log
+
+    options = Options()
+    # Headless is off by default for visibility and to avoid bot detection
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument(f"--window-size={LEAN_WINDOW_SIZE if lean else '1920,1080'}")
+    if lean:
+        options.add_argument("--autoplay-policy=user-gesture-required")
+        options.add_argument("--force-prefers-reduced-motion")
+        options.add_argument("--mute-audio")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option("useAutomationExtension", False)
+    enable_network_log(options) # Lets the tools confirm deletes/unlikes from the GraphQL responses
+    return options
+
+def make_driver_factory():
+    # Resolves the chromedriver binary once; the returned factory just launches Chrome
+    from selenium import webdriver
+    from selenium.common.exceptions import SessionNotCreatedException
+    from selenium.webdriver.chrome.service import Service
+
+    driver_path = cached_chromedriver_path()
+
+    def factory(options):
+        nonlocal driver_path
+        try:
+            return webdriver.Chrome(service=Service(driver_path), options=options)
+        except SessionNotCreatedException as e:
+            if profile_in_use(e):
+                raise # Not a driver problem, see initialize_driver
+            # Most often Chrome updated itself past the cached chromedriver: resolve it again, retry once
+            driver_path = cached_chromedriver_path(refresh=True)
+            return webdriver.Chrome(service=Service(driver_path), options=options)
+
+    return factory
+
+def cached_driver_factory():
+    # Under Streamlit, build the factory once per server process rather than on every session/rerun
+    import streamlit as st
+    return st.cache_resource(show_spinner=False)(make_driver_factory)()
+
+def apply_lean_mode(driver, blocked_urls=LEAN_BLOCKED_URLS):
+    # Block media/font downloads and ask pages for reduced motion; both persist for the whole session
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(blocked_urls)})
+    driver.execute_cdp_cmd("Emulation.setEmulatedMedia", {"features": [{"name": "prefers-reduced-motion", "value": "reduce"}]})
+
+def initialize_driver(factory=None, profile_dir=PROFILE_DIR, options=None, lean=False, headless=False, log=None):
+    from selenium.common.exceptions import SessionNotCreatedException
+
+    options = options or configure_chrome_options(lean=lean, headless=headless)
+    factory = factory or make_driver_factory()
+    if profile_dir:
+        use_persistent_profile(options, profile_dir)
+    try:
+        driver = factory(options)
+    except SessionNotCreatedException as e:
+        if not (profile_dir and profile_in_use(e)):
+            raise
+        # Another tool (or a Chrome left running) owns the profile: go on with a fresh one, which
+        # start_session then logs in from the cookie file
+        _log(log, f"The browser profile '{profile_dir}' is in use by another Chrome. Starting with a fresh profile.")
+        driver = factory(drop_persistent_profile(options, profile_dir))
+    if lean:
+        apply_lean_mode(driver)
+    return driver
+
+def load_cookies(driver, cookie_file, log=None, base_url=X_BASE_URL):
+    with open(cookie_file, "r") as f:
+        cookies = json.load(f)
+    add_cookies(driver, cookies, log, base_url)
+
+def add_cookies(driver, cookies, log=None, base_url=X_BASE_URL):
+    driver.get(f"{base_url}/robots.txt") # Go to a page on the domain before adding cookies; robots.txt avoids loading the app
+    for cookie in cookies:
+        # Remove sameSite if present, common issue, ensure domain is set
+        cookie.pop('sameSite', None)
+        # Ensure domain is correct if it's missing or too broad
+        if 'domain' not in cookie or 'x.com' not in cookie['domain']:
+            cookie['domain'] = '.x.com' # Set to base domain
+        if cookie.get('expiry') is not None:
+            cookie['expiry'] = int(cookie['expiry'])
+        else: # If expiry is None or not present, it's often a session cookie
+            cookie.pop('expiry', None)
+        try:
+            driver.add_cookie(cookie)
+        except Exception as e:
+            _log(log, f"Could not add cookie '{cookie.get('name')}': {e}")
+    _log(log, f"Attempted to load {len(cookies)} cookies.")
+
+def is_logged_in(driver, log=None, base_url=X_BASE_URL):
+    from selenium.webdriver.common.by import By
+    from waits import wait_until
+
+    _log(log, "Navigating to x.com/home to check login status...")
+    driver.get(f"{base_url}/home")
+    # Resolves as soon as either the home column renders or X redirects to the login flow
+    wait_until(driver, lambda d: "login" in d.current_url or d.find_elements(By.XPATH, LOGGED_IN_XPATH), timeout=10)
+    current_url = driver.current_url
+    _log(log, f"Current URL: {current_url}, Page Title: {driver.title}")
+    if "login" in current_url:
+        _log(log, "Login page detected by URL.")
+        return False
+    if driver.find_elements(By.XPATH, LOGGED_IN_XPATH):
+        _log(log, "Logged-in specific element (primary column/Home header) found.")
+        return True
+    _log(log, "Logged-in specific element not found after timeout. Assuming not logged in.")
+    return False
+
+def clone_session(driver, factory=None, lean=False, headless=False, base_url=X_BASE_URL, log=None):
+    # A second browser logged in as the same account (pipelined mode). It gets a throwaway profile,
+    # since only one Chrome can own PROFILE_DIR, seeded with the first browser's cookies.
+    if not driver.current_url.startswith(base_url):
+        driver.get(f"{base_url}/robots.txt")
+    cookies = driver.get_cookies()
+    clone = initialize_driver(factory, profile_dir=None, lean=lean, headless=headless)
+    add_cookies(clone, cookies, log, base_url)
+    return clone
+
+def start_session(driver, cookie_file=COOKIE_FILE, log=None, base_url=X_BASE_URL):
+    # Reuse the session stored in the browser profile when there is one, else inject the cookie file.
+    # A stored auth_token can outlive its session (logged out elsewhere, expired server-side), so the
+    # cookie file is the fallback for that too.
+    if has_auth_cookie(driver, base_url):
+        _log(log, "Reusing the session stored in the browser profile.")
+        if is_logged_in(driver, log, base_url):
+            return True
+        _log(log, "The session stored in the browser profile is no longer valid. Loading the cookie file instead.")
+    load_cookies(driver, cookie_file, log, base_url)
+    return is_logged_in(driver, log, base_url)
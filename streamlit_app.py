@@ -1,114 +1,86 @@
-import streamlit as st
 import os
-import json
+import queue
+import threading
 import time
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
+from collections import Counter
+from urllib.parse import quote
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-
-COOKIE_FILE = "twitter_cookies.json"
-
-def configure_chrome_options():
-    options = Options()
-    # options.add_argument("--headless=new") # Enable for headless operation if needed
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option("useAutomationExtension", False)
-    return options
-
-def initialize_driver():
-    options = configure_chrome_options()
-    try:
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        return driver
-    except Exception as e:
-        st.error(f"Failed to initialize Chrome WebDriver: {e}")
-        st.error("This might be due to an issue with ChromeDriverManager or your Chrome installation.")
-        st.info("Consider: \n1. Ensuring Chrome is installed and up to date. \n2. Checking your internet connection. \n3. If behind a proxy, ChromeDriverManager might need proxy settings.")
-        return None
-
-
-def load_cookies(driver, cookie_file):
-    with open(cookie_file, "r") as f:
-        cookies = json.load(f)
-    driver.get("https://x.com/") # Go to a page on the domain before adding cookies
-    for cookie in cookies:
-        # Remove sameSite if present, common issue, ensure domain is set
-        if 'sameSite' in cookie:
-            del cookie['sameSite']
-        # Ensure domain is correct if it's missing or too broad
-        if 'domain' not in cookie or 'x.com' not in cookie['domain']:
-            cookie['domain'] = '.x.com' # Set to base domain
-            
-        if 'expiry' in cookie and cookie['expiry'] is not None:
-            cookie['expiry'] = int(cookie['expiry'])
-        else: # If expiry is None or not present, it's often a session cookie
-            if 'expiry' in cookie: del cookie['expiry']
-
 
-        try:
-            driver.add_cookie(cookie)
-        except Exception as e:
-            st.warning(f"Could not add cookie '{cookie.get('name')}': {e}")
-            pass
-    st.write(f"Attempted to load {len(cookies)} cookies.")
-
-def is_logged_in(driver):
-    st.write("Navigating to x.com/home to check login status...")
-    driver.get("https://x.com/home")
-    time.sleep(4) # Increased sleep for page load and redirects
-    current_url = driver.current_url
-    page_title = driver.title
-    st.write(f"Current URL: {current_url}, Page Title: {page_title}")
-
-    if "login" in current_url or "i/flow/login" in current_url:
-        st.write("Login page detected by URL.")
-        return False
-    
-    # Check for a known element that indicates being logged in (e.g., primary column, home timeline)
+from archive_planner import read_candidate_ids
+from browser_health import BrowserHealth
+from checkpoint import CHECKPOINT_FILE, DELETED, FAILED, KEPT, SETTLED_VERDICTS, CheckpointStore, Watermark
+from extractor import (
+    ARTICLE_XPATH, classify_reply, drain_new_articles, extract_articles, forget_article, handle_from_href, reset_article_queue,
+    resolve_article, status_id_from_href,
+)
+from jobs import render_job_panel, shared_runner
+from metrics import METRICS_REPORT, PROMETHEUS_FILE
+from network_confirm import DELETE_TWEET, confirm_mutation, discard_network_log, last_mutation_response
+from pacing import PacingController
+from progress import LOG_FILE, RunProgress
+from rules import DEFAULT_RULES, compile_rules
+from selector_cache import selector_registry
+from session_core import COOKIE_FILE, X_BASE_URL, cached_driver_factory, clone_session, initialize_driver, start_session
+from waits import (
+    POLL_INTERVAL, close_open_menu, scroll_and_wait_for_new_articles, wait_for_element,
+    wait_for_gone, wait_for_staleness, wait_until,
+)
+
+PIPELINE_QUEUE_SIZE = 25 # Scanned-but-not-yet-deleted ids the scanner may run ahead by
+WATERMARK_STOP_AFTER = 3 # Own articles in a row below the watermark before an incremental walk stops
+
+def action_kinds(action_choice):
+    # Kinds of own tweets an action selects, whichever timelines it walks
+    return tuple(kind for _, kinds in plan_walks(action_choice) for kind in kinds)
+
+def plan_walks(action_choice):
+    # (timeline to walk, kinds of articles selected on it) per action. The Replies timeline also
+    # carries the top-level posts, so "Both" is one walk over it instead of one per tab.
+    if "Both" in action_choice:
+        return [("Replies", ("posts", "replies"))]
+    return [(tab_name, (tab_name.lower(),)) for tab_name in ("Posts", "Replies") if tab_name in action_choice]
+
+def resume_url(handle, below_status_id, base_url=X_BASE_URL):
+    # The account's tweets older than below_status_id, newest first: X's "Latest" search with the
+    # max_id operator (inclusive, hence the -1). A memory reload lands here instead of at the top of
+    # the timeline, so it doesn't have to scroll back down past everything already handled.
+    if not handle or not below_status_id:
+        return None
+    query = quote(f"from:{handle} max_id:{int(below_status_id) - 1}")
+    return f"{base_url}/search?q={query}&src=typed_query&f=live"
+
+PROFILE_LINK_SELECTORS = [
+    '//a[@data-testid="AppTabBar_Profile_Link"]', # Primary test ID
+    '//a[@aria-label="Profile"]', # Accessibility label
+]
+MORE_BUTTON_SELECTORS = [
+    './/div[@data-testid="caret"]', 
+    './/div[contains(@aria-label,"More") and @role="button"]', # More flexible aria-label check
+    './/div[@role="button" and @tabindex="0" and .//*[local-name()="svg" and (contains(@aria-label,"More") or @aria-label="Down arrow")]]',
+]
+
+def go_to_profile(driver, progress):
     try:
-        WebDriverWait(driver, 7).until(
-            EC.presence_of_element_located((By.XPATH, '//div[@data-testid="primaryColumn"]//section[.//h1[contains(text(),"Home")]] | //main[@role="main"]//div[contains(@data-testid,"primaryColumn")]'))
-        )
-        st.write("Logged-in specific element (primary column/Home header) found.")
-        return True
-    except TimeoutException:
-        st.write("Logged-in specific element not found after timeout. Assuming not logged in.")
-        # driver.save_screenshot("debug_is_logged_in_fail.png")
-        # st.image("debug_is_logged_in_fail.png", caption="Login Check Failed Screenshot")
-        return False
+        progress.debug("Attempting to navigate to profile...")
 
-def go_to_profile(driver):
-    try:
-        st.write("Attempting to navigate to profile...")
-        profile_link_selectors = [
-            '//a[@data-testid="AppTabBar_Profile_Link"]', # Primary test ID
-            '//a[@aria-label="Profile"]', # Accessibility label
-        ]
-        profile_link_element = None
-        for i, selector in enumerate(profile_link_selectors):
+        def clickable(selector):
             try:
-                st.write(f"Trying profile selector {i+1}: {selector}")
-                profile_link_element = WebDriverWait(driver, 7).until(
+                progress.debug(f"Trying profile selector: {selector}")
+                return WebDriverWait(driver, 7).until(
                     EC.element_to_be_clickable((By.XPATH, selector))
                 )
-                if profile_link_element:
-                    st.write("Profile link found and clickable.")
-                    break
             except TimeoutException:
-                st.write(f"Profile selector {i+1} timed out.")
-                continue
+                progress.debug(f"Profile selector timed out: {selector}")
+                return None
+
+        # The selector that worked last time is tried first, so a stale one doesn't cost 7s every run
+        profile_link_element = selector_registry().find("profile_link", PROFILE_LINK_SELECTORS, clickable)
+        if profile_link_element:
+            progress.debug("Profile link found and clickable.")
         
         if profile_link_element:
             driver.execute_script("arguments[0].click();", profile_link_element) # JS click can be more robust
@@ -118,310 +90,708 @@ def go_to_profile(driver):
             WebDriverWait(driver, 10).until(
                  EC.presence_of_element_located((By.XPATH, '//nav[@aria-label="Profile timelines"]')) 
             )
-            time.sleep(2) # Additional pause for content to settle
-            st.write("Successfully navigated to profile page.")
+            wait_for_element(driver, ARTICLE_XPATH, timeout=5) # Let the timeline render its first article
+            progress.write("Successfully navigated to profile page.")
             return True
         else:
-            st.error("Profile link not found with any selector.")
+            progress.error("Profile link not found with any selector.")
             # driver.save_screenshot("debug_profile_link_not_found.png")
             # st.image("debug_profile_link_not_found.png")
             return False
     except Exception as e:
-        st.error(f"Error navigating to profile: {e}")
+        progress.error(f"Error navigating to profile: {e}")
         # driver.save_screenshot(f"debug_profile_nav_exception.png")
         # st.image(f"debug_profile_nav_exception.png")
         return False
 
-def go_to_tab(driver, tab_name):
+def go_to_tab(driver, tab_name, progress):
     try:
-        st.write(f"Attempting to navigate to '{tab_name}' tab...")
+        progress.debug(f"Attempting to navigate to '{tab_name}' tab...")
         tab_xpath = f'//nav[@aria-label="Profile timelines"]//a[.//span[text()="{tab_name}"]]'
-        st.write(f"Using XPath for tab: {tab_xpath}")
+        progress.debug(f"Using XPath for tab: {tab_xpath}")
         tab_element = WebDriverWait(driver, 10).until(
             EC.element_to_be_clickable((By.XPATH, tab_xpath))
         )
-        st.write(f"'{tab_name}' tab element found. Clicking...")
+        progress.debug(f"'{tab_name}' tab element found. Clicking...")
         driver.execute_script("arguments[0].click();", tab_element) # JS click
         # tab_element.click()
 
         WebDriverWait(driver, 10).until(
             EC.attribute_to_be((By.XPATH, tab_xpath), "aria-selected", "true")
         )
-        time.sleep(2) 
-        st.success(f"Successfully navigated to '{tab_name}' tab.")
+        wait_for_element(driver, ARTICLE_XPATH, timeout=5) # Let the tab's timeline render
+        progress.success(f"Successfully navigated to '{tab_name}' tab.")
         return True
     except TimeoutException:
-        st.error(f"Could not find or click the '{tab_name}' tab. It might not be visible, the selector is outdated, or navigation confirmation failed.")
+        progress.error(f"Could not find or click the '{tab_name}' tab. It might not be visible, the selector is outdated, or navigation confirmation failed.")
         # driver.save_screenshot(f"debug_goto_{tab_name}_tab_fail.png") 
         # st.image(f"debug_goto_{tab_name}_tab_fail.png")
         return False
     except Exception as e:
-        st.error(f"Error navigating to '{tab_name}' tab: {e}")
+        progress.error(f"Error navigating to '{tab_name}' tab: {e}")
         return False
 
 def find_more_button(article_element):
-    selectors = [
-        './/div[@data-testid="caret"]', 
-        './/div[contains(@aria-label,"More") and @role="button"]', # More flexible aria-label check
-        './/div[@role="button" and @tabindex="0" and .//*[local-name()="svg" and (contains(@aria-label,"More") or @aria-label="Down arrow")]]',
-    ]
-    for i, sel in enumerate(selectors):
-        # st.write(f"Trying 'More' button selector #{i+1}: {sel} within article.")
+    def visible_button(sel):
+        # st.write(f"Trying 'More' button selector: {sel} within article.")
         try:
             btns = article_element.find_elements(By.XPATH, sel)
-            if btns:
-                for btn_idx, btn in enumerate(btns): 
-                    if btn.is_displayed() and btn.is_enabled():
-                        # st.write(f"'More' button found with selector #{i+1}, element index {btn_idx}.")
-                        return btn
+            for btn_idx, btn in enumerate(btns): 
+                if btn.is_displayed() and btn.is_enabled():
+                    # st.write(f"'More' button found with selector {sel}, element index {btn_idx}.")
+                    return btn
         except NoSuchElementException:
-            continue
-    # st.write("No 'More' button found with any selector in this article.")
-    return None
+            pass
+        return None
+
+    # Tried in ranked order (last match first), see selector_cache.py
+    return selector_registry().find("more_button", MORE_BUTTON_SELECTORS, visible_button)
 
-def hover_and_find_more(driver, article, article_idx, tab_name):
-    st.write(f"[{tab_name}] Article {article_idx+1}: Attempting to find 'More' button...")
+def hover_and_find_more(driver, article, article_idx, tab_name, progress):
+    progress.debug(f"[{tab_name}] Article {article_idx+1}: Attempting to find 'More' button...")
+    metrics = progress.metrics
     try:
-        # Scroll article to center for better hover interaction
-        # st.write(f"[{tab_name}] Article {article_idx+1}: Scrolling article to center.")
-        driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", article)
-        time.sleep(0.5) # Pause for scrolling
-
-        # st.write(f"[{tab_name}] Article {article_idx+1}: Hovering over article.")
-        ActionChains(driver).move_to_element(article).perform()
-        time.sleep(1.0) # Wait for 'More' button to appear after hover
+        with metrics.phase("hover"):
+            # Scroll article to center for better hover interaction
+            # st.write(f"[{tab_name}] Article {article_idx+1}: Scrolling article to center.")
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", article) # Instant scroll, no pause needed
+
+            # st.write(f"[{tab_name}] Article {article_idx+1}: Hovering over article.")
+            ActionChains(driver).move_to_element(article).perform()
+        with metrics.phase("find_more"):
+            more_btn = wait_until(driver, lambda d: find_more_button(article), timeout=1.5) # Returns as soon as 'More' renders
         
-        more_btn = find_more_button(article)
         if more_btn:
-            st.write(f"[{tab_name}] Article {article_idx+1}: 'More' button found after hover.")
+            progress.debug(f"[{tab_name}] Article {article_idx+1}: 'More' button found after hover.")
             return more_btn
         else: # Button not found after initial hover
-             st.write(f"[{tab_name}] Article {article_idx+1}: 'More' button not found on first hover/scroll. Will try one more time with slight move.")
+             progress.debug(f"[{tab_name}] Article {article_idx+1}: 'More' button not found on first hover/scroll. Will try one more time with slight move.")
              # Try a slight move then re-hover, sometimes helps
-             ActionChains(driver).move_by_offset(0,1).move_by_offset(0,-1).perform() # Jiggle mouse
-             time.sleep(0.5)
-             ActionChains(driver).move_to_element(article).perform()
-             time.sleep(1.0)
-             more_btn = find_more_button(article)
+             with metrics.phase("hover"):
+                 ActionChains(driver).move_by_offset(0,1).move_by_offset(0,-1).perform() # Jiggle mouse
+                 ActionChains(driver).move_to_element(article).perform()
+             with metrics.phase("find_more"):
+                 more_btn = wait_until(driver, lambda d: find_more_button(article), timeout=1.5)
              if more_btn:
-                 st.write(f"[{tab_name}] Article {article_idx+1}: 'More' button found after second hover attempt.")
+                 progress.debug(f"[{tab_name}] Article {article_idx+1}: 'More' button found after second hover attempt.")
                  return more_btn
 
-        st.warning(f"[{tab_name}] Article {article_idx+1}: 'More' button NOT found after multiple attempts.")
+        progress.warning(f"[{tab_name}] Article {article_idx+1}: 'More' button NOT found after multiple attempts.")
         return None
     except StaleElementReferenceException:
-        st.warning(f"[{tab_name}] Article {article_idx+1}: Stale element during hover/find_more. Article might have been removed or DOM refreshed.")
-        return None
+        progress.warning(f"[{tab_name}] Article {article_idx+1}: Stale element during hover/find_more. Article might have been removed or DOM refreshed.")
+        raise # The caller re-resolves the article by its permalink
     except Exception as e:
-        st.error(f"[{tab_name}] Article {article_idx+1}: Exception during hover/find_more_button: {e}")
+        progress.error(f"[{tab_name}] Article {article_idx+1}: Exception during hover/find_more_button: {e}")
         return None
 
-def delete_empty_tweets_in_tab(driver, tab_name):
-    if not go_to_profile(driver): return 0
-    if not go_to_tab(driver, tab_name): return 0
+def delete_via_more_menu(driver, article_element, idx, tab_name, progress, status_id=None):
+    # "More" -> "Delete" -> confirmationSheetConfirm on one article. Returns DELETED or FAILED;
+    # StaleElementReferenceException is left to the caller, which owns the article list.
+    # DELETED means X's DeleteTweet GraphQL call succeeded (or, without the network log, that
+    # the article left the DOM), not just that the confirm button was clicked.
+    more_button = hover_and_find_more(driver, article_element, idx, tab_name, progress)
+    if not more_button:
+        progress.warning(f"[{tab_name}] Article {idx+1}: Could not find 'More' button. Skipping.")
+        return FAILED
+
+    progress.debug(f"[{tab_name}] Article {idx+1}: 'More' button found. Scrolling it into view...")
+    driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", more_button)
+
+    clicked_more_button = False
+    progress.debug(f"[{tab_name}] Article {idx+1}: Attempting to click 'More' button...")
+    try:
+        # Try JavaScript click first as it can be more direct
+        progress.debug(f"[{tab_name}] Article {idx+1}: Trying JS click on 'More' button.")
+        driver.execute_script("arguments[0].click();", more_button)
+        clicked_more_button = True
+        progress.debug(f"[{tab_name}] Article {idx+1}: JS click on 'More' button succeeded (apparently).")
+    except Exception as e_js_click:
+        progress.debug(f"[{tab_name}] Article {idx+1}: JS click failed: {e_js_click}. Trying ActionChains click.")
+        try:
+            ActionChains(driver).move_to_element(more_button).click().perform()
+            clicked_more_button = True
+            progress.debug(f"[{tab_name}] Article {idx+1}: ActionChains click on 'More' succeeded (apparently).")
+        except Exception as e_ac_click:
+            progress.error(f"[{tab_name}] Article {idx+1}: ActionChains click also failed: {e_ac_click}")
+    
+    if not clicked_more_button:
+        progress.error(f"[{tab_name}] Article {idx+1}: All attempts to click 'More' button FAILED.")
+        return FAILED
+    
+    progress.debug(f"[{tab_name}] Article {idx+1}: Clicked 'More'. Now waiting for 'Delete' option in menu...")
+    
+    delete_option_xpath = '//div[@role="menuitem" and (.//span[contains(translate(text(),"DELETE","delete"),"delete")] or contains(translate(@aria-label,"DELETE","delete"),"delete"))]'
+    delete_menu_item = None
+    try:
+        with progress.metrics.phase("menu_render"):
+            delete_menu_item = WebDriverWait(driver, 5, poll_frequency=POLL_INTERVAL).until( # Returns as soon as the menu opens
+                EC.visibility_of_element_located((By.XPATH, delete_option_xpath))
+            )
+        progress.debug(f"[{tab_name}] Article {idx+1}: 'Delete' option found and VISIBLE in menu.")
+    except TimeoutException:
+        progress.error(f"CRITICAL: [{tab_name}] Article {idx+1}: 'Delete' option DID NOT APPEAR after clicking 'More'.")
+        progress.info("This is the common failure point. The 'More' menu might not have opened, or its content is unexpected.")
+        # driver.save_screenshot(f"debug_article_{idx+1}_{tab_name}_NO_DELETE_OPTION.png")
+        # st.image(f"debug_article_{idx+1}_{tab_name}_NO_DELETE_OPTION.png", caption=f"Article {idx+1} - No Delete Option Screenshot")
+        progress.warning("If you see this, please check the screenshot (if enabled) or the browser state if not headless. The menu may have closed or its XPaths changed.")
+        close_open_menu(driver) # Attempt to close any unexpected menu/dialog
+        return FAILED
+
+    progress.debug(f"[{tab_name}] Article {idx+1}: Clicking 'Delete' option...")
+    try:
+        with progress.metrics.phase("confirm"):
+            # Click the "Delete" menu item
+            driver.execute_script("arguments[0].click();", delete_menu_item) # JS click often better for menu items
+            # ActionChains(driver).move_to_element(delete_menu_item).click().perform()
+
+            progress.debug(f"[{tab_name}] Article {idx+1}: Clicked 'Delete'. Waiting for confirmation button...")
+            confirm_button_xpath = '//div[@data-testid="confirmationSheetConfirm"]'
+            confirm_button = WebDriverWait(driver, 10, poll_frequency=POLL_INTERVAL).until(
+                EC.element_to_be_clickable((By.XPATH, confirm_button_xpath))
+            )
+            progress.debug(f"[{tab_name}] Article {idx+1}: Confirmation button found. Clicking confirm...")
+            driver.execute_script("arguments[0].click();", confirm_button) # JS click
+            # ActionChains(driver).move_to_element(confirm_button).click().perform()
+
+        with progress.metrics.phase("settle"):
+            # The DeleteTweet response is the completion signal; the DOM is only the fallback
+            confirmed = confirm_mutation(driver, DELETE_TWEET, status_id, timeout=10)
+            wait_for_gone(driver, confirm_button_xpath, timeout=10)
+            if confirmed is None:
+                confirmed = wait_for_staleness(driver, article_element, timeout=5)
+        if not confirmed:
+            progress.error(f"[{tab_name}] Article {idx+1}: X did not confirm the deletion. Recording as failed.")
+            return FAILED
+        return DELETED
+    except Exception as e_final_delete:
+        progress.error(f"[{tab_name}] Article {idx+1}: Error during final delete/confirmation: {e_final_delete}")
+        # driver.save_screenshot(f"debug_final_delete_fail_article_{idx+1}_{tab_name}.png")
+        # st.image(f"debug_final_delete_fail_article_{idx+1}_{tab_name}.png")
+        close_open_menu(driver) # Try to dismiss dialog
+        return FAILED
+
+def delete_candidate(driver, article_element, href, idx, tab_name, progress):
+    # If the held reference goes stale, re-find just this article by its permalink and retry once,
+    # instead of abandoning the batch and rescanning the page
+    status_id = status_id_from_href(href)
+    try:
+        return delete_via_more_menu(driver, article_element, idx, tab_name, progress, status_id)
+    except StaleElementReferenceException:
+        fresh = resolve_article(driver, href, idx)
+        if fresh is None:
+            raise
+        progress.write(f"[{tab_name}] Article {idx+1}: Re-resolved by permalink after going stale. Retrying.")
+        close_open_menu(driver)
+        return delete_via_more_menu(driver, fresh["element"], idx, tab_name, progress, status_id)
+
+def delete_empty_tweets_in_tab(driver, tab_name, store=None, candidate_ids=None, progress=None, pacer=None, sink=None, rules=None, dry_run=False, watermark=None, kinds=None, seen=None, health=None):
+    # rules (rules.RuleSet) selects what gets deleted, by default everything with zero engagement.
+    # With a sink (pipelined mode), matches are handed to sink(status_id) for deletion elsewhere
+    # instead of being deleted on this page; with dry_run they are only counted (the preview).
+    # With a watermark (checkpoint.Watermark, incremental mode) the walk stops once it reaches
+    # posts settled by an earlier complete walk, and passes the range an earlier capped walk covered
+    # without counting it against the scroll cap; the caller saves the watermark afterwards.
+    # kinds limits the walk to "posts" and/or "replies" (extractor.classify_reply); seen is the set
+    # of permalinks already handled, shared across walks of one run. With health
+    # (browser_health.BrowserHealth) the timeline is reloaded whenever Chrome's memory runs high.
+    progress = progress or RunProgress(log_file=None)
+    pacer = pacer or PacingController()
+    rules = rules or compile_rules(DEFAULT_RULES)
+    if not go_to_profile(driver, progress): return 0, 0
+    if not go_to_tab(driver, tab_name, progress): return 0, 0
+    reset_article_queue(driver) # Start from a clean page-side queue, whatever ran in this tab before
+    own_handle = handle_from_href(driver.current_url) # Replies timelines also show the tweets being replied to
 
     deleted_count = 0
+    menus_avoided = 0 # Articles ruled out from their stats alone, without opening the "More" menu
     scroll_attempts = 0
     max_empty_scrolls = 3
     empty_scrolls_in_a_row = 0
-    checked_article_ids = set()
+    checked_article_ids = seen if seen is not None else set()
+    resumed_skips = 0 # Articles settled in a previous run, skipped via the checkpoint store
+    below_watermark = 0 # Own articles in a row at or below the watermark
+    last_status_id = None # Latest verdict so far
+    resume_below = None # Oldest own status in timeline order the walk has reached, see resume_url()
+    catching_up = False # After a reload: scrolling back down past articles already handled
+    if watermark and watermark.newest:
+        progress.write(f"[{tab_name}] Incremental run: stopping once the walk reaches status {watermark.newest} or older" + (f" (below the oldest open item {watermark.open_floor})." if watermark.open_floor else "."))
+    if watermark and watermark.walked_floor:
+        progress.write(f"[{tab_name}] An earlier walk stopped at the scroll cap: statuses {watermark.walked_top} down to {watermark.walked_floor} are passed without counting against the cap.")
+    # With a planned candidate list (archive_planner.py), only those ids are considered and the
+    # scan stops as soon as every one of them has been handled
+    remaining_candidates = None
+    if candidate_ids is not None:
+        remaining_candidates = {i for i in candidate_ids if not (store and store.is_settled(rules.scope, i))}
+        progress.write(f"[{tab_name}] Working from a planned list: {len(remaining_candidates)} candidates left to handle.")
+
+    def settle(article_id_for_check, status_id, verdict):
+        nonlocal last_status_id
+        checked_article_ids.add(article_id_for_check)
+        last_status_id = status_id or last_status_id
+        progress.record(verdict)
+        if store and not dry_run: # A preview leaves the checkpoint as it was
+            store.record(rules.scope, status_id, verdict)
+        if watermark and status_id:
+            if verdict == FAILED:
+                watermark.leave_open(status_id)
+            else:
+                watermark.settle(status_id)
+        if remaining_candidates is not None:
+            remaining_candidates.discard(status_id)
 
     while empty_scrolls_in_a_row < max_empty_scrolls:
-        st.write(f"--- Starting scroll pass {scroll_attempts + 1} for {tab_name} ---")
+        progress.debug(f"--- Starting scroll pass {scroll_attempts + 1} for {tab_name} ---")
+        rewalking = False # Pass only re-covered what an earlier capped walk already did
+        progress.checkpoint() # Pause/cancel point when running as a background job
+        reason = health.over_limit() if health else None
+        if reason:
+            # Verdicts are already committed per item and the seen-set survives, so nothing is lost.
+            # The reload resumes below the oldest status reached; without one (no handle, nothing
+            # reached yet) it reopens the timeline and skips what was handled until it is past it.
+            url = resume_url(own_handle, resume_below)
+            progress.warning(f"[{tab_name}] {reason}. Reloading " + (f"the account's tweets older than status {resume_below}." if url else f"the timeline and resuming after status {last_status_id}."))
+            with progress.metrics.phase("reload"):
+                health.reload(url)
+            catching_up = url is None
+            if health.exhausted:
+                progress.warning(f"[{tab_name}] That was the last of {health.max_reloads} reloads allowed per run; memory is no longer watched.")
         try:
             WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, '//article[@data-testid="tweet"]'))
+                EC.presence_of_element_located((By.XPATH, ARTICLE_XPATH))
             )
-            articles_on_page = driver.find_elements(By.XPATH, '//article[@data-testid="tweet"]')
-            st.write(f"Found {len(articles_on_page)} articles on this pass.")
+            # One round trip for the articles X inserted since the last pass (page-side MutationObserver
+            # queue), so articles already on screen are never re-read
+            with progress.metrics.phase("drain"):
+                articles_on_page = drain_new_articles(driver)
+            progress.debug(f"Found {len(articles_on_page)} new articles on this pass.")
             
-            if not articles_on_page and scroll_attempts > 0:
+            if not articles_on_page:
                 empty_scrolls_in_a_row += 1
-                st.write(f"No articles found on this scroll. Empty scroll count: {empty_scrolls_in_a_row}")
+                progress.write(f"No new articles since the last pass. Empty scroll count: {empty_scrolls_in_a_row}")
             
+            # --- Pass 1: evaluate the rules on the batch's metadata, keep only deletion candidates ---
             new_articles_processed_this_pass = 0
-            for idx, article_element in enumerate(articles_on_page):
-                article_id_for_check = f"scroll{scroll_attempts}-idx{idx}" # Simple ID for now
-                try:
-                    # More robust ID from permalink if possible
-                    permalink_elements = article_element.find_elements(By.XPATH, './/a[.//time and contains(@href,"/status/")]')
-                    if permalink_elements and permalink_elements[0].get_attribute("href"):
-                        article_id_for_check = permalink_elements[0].get_attribute("href")
-                except: pass
+            new_ground = False # Any new article outside the range an earlier capped walk covered
+            to_check = []
+            candidates = []
+            for article in articles_on_page:
+                idx = article["idx"]
+                article_id_for_check = article["href"] or f"scroll{scroll_attempts}-idx{idx}"
 
                 if article_id_for_check in checked_article_ids:
                     # st.write(f"Article {idx+1} (ID: {article_id_for_check.split('/')[-1]}) already checked. Skipping.")
                     continue
-                
-                new_articles_processed_this_pass += 1
-                tweet_text_preview = article_element.text[:70].replace('\n', ' ')
-                st.markdown(f"**Processing Article {idx+1} (ID: `{article_id_for_check.split('/')[-1]}`):** '{tweet_text_preview}...'")
 
-                more_button = hover_and_find_more(driver, article_element, idx, tab_name)
-                if not more_button:
-                    st.warning(f"[{tab_name}] Article {idx+1}: Could not find 'More' button. Skipping.")
+                if own_handle and handle_from_href(article["href"]) != own_handle:
+                    # Someone else's tweet: the parent of a reply, or a repost. Never ours to delete.
                     checked_article_ids.add(article_id_for_check)
                     continue
 
-                st.write(f"[{tab_name}] Article {idx+1}: 'More' button found. Scrolling it into view...")
-                driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", more_button)
-                time.sleep(0.3) # Wait for scroll
-
-                clicked_more_button = False
-                st.write(f"[{tab_name}] Article {idx+1}: Attempting to click 'More' button...")
-                try:
-                    # Try JavaScript click first as it can be more direct
-                    st.write(f"[{tab_name}] Article {idx+1}: Trying JS click on 'More' button.")
-                    driver.execute_script("arguments[0].click();", more_button)
-                    clicked_more_button = True
-                    st.write(f"[{tab_name}] Article {idx+1}: JS click on 'More' button succeeded (apparently).")
-                except Exception as e_js_click:
-                    st.write(f"[{tab_name}] Article {idx+1}: JS click failed: {e_js_click}. Trying ActionChains click.")
-                    try:
-                        ActionChains(driver).move_to_element(more_button).click().perform()
-                        clicked_more_button = True
-                        st.write(f"[{tab_name}] Article {idx+1}: ActionChains click on 'More' succeeded (apparently).")
-                    except Exception as e_ac_click:
-                        st.error(f"[{tab_name}] Article {idx+1}: ActionChains click also failed: {e_ac_click}")
-                
-                if not clicked_more_button:
-                    st.error(f"[{tab_name}] Article {idx+1}: All attempts to click 'More' button FAILED.")
+                new_articles_processed_this_pass += 1
+                progress.count("scanned")
+                status_id = article["status_id"]
+                article["is_reply"] = classify_reply(article, own_handle)
+                in_order = not article["social_context"] # Pinned posts and own reposts sit out of id order
+                if status_id and in_order and (resume_below is None or int(status_id) < int(resume_below)):
+                    resume_below = status_id
+                if watermark and status_id and in_order:
+                    below_watermark = below_watermark + 1 if watermark.reached(status_id) else 0
+                new_ground = new_ground or not (watermark and status_id and in_order and watermark.walked(status_id))
+                if store and store.is_settled(rules.scope, status_id):
                     checked_article_ids.add(article_id_for_check)
+                    resumed_skips += 1
+                    progress.count("skipped")
                     continue
-                
-                time.sleep(0.8) # Crucial: Wait for the menu to actually open after the click
-                st.write(f"[{tab_name}] Article {idx+1}: Clicked 'More'. Now waiting for 'Delete' option in menu...")
-                
-                delete_option_xpath = '//div[@role="menuitem" and (.//span[contains(translate(text(),"DELETE","delete"),"delete")] or contains(translate(@aria-label,"DELETE","delete"),"delete"))]'
-                delete_menu_item = None
-                try:
-                    delete_menu_item = WebDriverWait(driver, 5).until( # Reduced wait slightly, menu should appear fast
-                        EC.visibility_of_element_located((By.XPATH, delete_option_xpath))
-                    )
-                    st.success(f"[{tab_name}] Article {idx+1}: 'Delete' option found and VISIBLE in menu.")
-                except TimeoutException:
-                    st.error(f"CRITICAL: [{tab_name}] Article {idx+1}: 'Delete' option DID NOT APPEAR after clicking 'More'.")
-                    st.info("This is the common failure point. The 'More' menu might not have opened, or its content is unexpected.")
-                    # driver.save_screenshot(f"debug_article_{idx+1}_{tab_name}_NO_DELETE_OPTION.png")
-                    # st.image(f"debug_article_{idx+1}_{tab_name}_NO_DELETE_OPTION.png", caption=f"Article {idx+1} - No Delete Option Screenshot")
-                    st.warning("If you see this, please check the screenshot (if enabled) or the browser state if not headless. The menu may have closed or its XPaths changed.")
-                    driver.execute_script("document.body.click();") # Attempt to close any unexpected menu/dialog
-                    time.sleep(0.5)
+                if kinds and ("replies" if article["is_reply"] else "posts") not in kinds:
+                    checked_article_ids.add(article_id_for_check) # Not selected on this walk, no stats check or menu
+                    progress.count("skipped")
+                    continue
+                if remaining_candidates is not None and status_id not in remaining_candidates:
+                    checked_article_ids.add(article_id_for_check) # Not in the plan, no stats check or menu
+                    progress.count("skipped")
+                    continue
+
+                to_check.append((article, article_id_for_check))
+
+            for (article, article_id_for_check), match in zip(to_check, rules.evaluate([a for a, _ in to_check])):
+                idx, status_id = article["idx"], article["status_id"]
+                if match is None:
+                    progress.warning(f"[{tab_name}] Article {idx+1}: Could not read stats/date reliably. Skipping to be safe.")
+                    settle(article_id_for_check, status_id, FAILED)
+                elif match:
+                    progress.count("matched")
+                    candidates.append((idx, article["element"], article_id_for_check, status_id, article["text_preview"]))
+                else:
+                    progress.debug(f"[{tab_name}] Article {idx+1}: Not deleting (doesn't match the rules; engagement: R:{article['replies']}, RP:{article['reposts']}, L:{article['likes']}). 'More' menu not opened.")
+                    menus_avoided += 1
+                    if rules.too_young(article):
+                        # Not a verdict yet: left out of the checkpoint and open for the watermark,
+                        # so a later run judges it again once it is old enough
+                        checked_article_ids.add(article_id_for_check)
+                        progress.count("skipped")
+                        if watermark and status_id:
+                            watermark.leave_open(status_id)
+                    else:
+                        settle(article_id_for_check, status_id, KEPT)
+
+            rewalking = bool(new_articles_processed_this_pass) and not new_ground
+            if catching_up and new_articles_processed_this_pass:
+                progress.info(f"[{tab_name}] Back past status {last_status_id} after the reload.")
+                catching_up = False
+            if health and new_articles_processed_this_pass:
+                health.advance() # Another reload is only worth it once the walk has moved on
+
+            if articles_on_page:
+                progress.write(f"[{tab_name}] {len(candidates)} of {new_articles_processed_this_pass} new articles match the rules ({rules.description}). Settled in earlier runs so far: {resumed_skips}.")
+
+            if dry_run:
+                for idx, article_element, article_id_for_check, status_id, tweet_text_preview in candidates:
                     checked_article_ids.add(article_id_for_check)
-                    continue 
-                
-                # --- If Delete option is found, proceed with stat checking and deletion ---
-                replies, reposts, likes = 0,0,0 # Initialize stats
+                    if remaining_candidates is not None:
+                        remaining_candidates.discard(status_id)
+                    progress.info(f"[{tab_name}] Article {idx+1}: would delete '{tweet_text_preview}...'")
+                    last_status_id = status_id or last_status_id
+                candidates = []
+
+            if sink:
+                # Pipelined mode: queue candidates for the deleting browser; this page only scans
+                for idx, article_element, article_id_for_check, status_id, tweet_text_preview in candidates:
+                    checked_article_ids.add(article_id_for_check)
+                    if remaining_candidates is not None:
+                        remaining_candidates.discard(status_id)
+                    progress.debug(f"[{tab_name}] Article {idx+1}: queued {status_id} for deletion '{tweet_text_preview}...'")
+                    if watermark and status_id:
+                        watermark.leave_open(status_id) # Until the deleting side reports back
+                    last_status_id = status_id or last_status_id
+                    sink(status_id)
+                candidates = []
+
+            # --- Pass 2: open the "More" menu only for candidates ---
+            for idx, article_element, article_id_for_check, status_id, tweet_text_preview in candidates:
+                progress.checkpoint()
                 try:
-                    stat_elements_config = {
-                        "reply": './/button[@data-testid="reply"]//span[@data-testid="app-text-transition-container"]/span',
-                        "retweet": './/button[@data-testid="retweet"]//span[@data-testid="app-text-transition-container"]/span',
-                        "like": './/button[@data-testid="like"]//span[@data-testid="app-text-transition-container"]/span',
-                    }
-                    temp_stats = {}
-                    for stat_name, stat_xpath in stat_elements_config.items():
-                        elements = article_element.find_elements(By.XPATH, stat_xpath)
-                        for el in elements:
-                            if el.is_displayed() and el.text.strip():
-                                temp_stats[stat_name] = int(el.text.strip().replace(',', ''))
-                                break
-                        if stat_name not in temp_stats: temp_stats[stat_name] = 0 # Default to 0 if not found
-
-                    replies = temp_stats.get("reply",0)
-                    reposts = temp_stats.get("retweet",0)
-                    likes = temp_stats.get("like",0)
-                    st.write(f"[{tab_name}] Article {idx+1}: Stats: Replies={replies}, Reposts={reposts}, Likes={likes}")
-                except Exception as e_stat:
-                    st.warning(f"[{tab_name}] Article {idx+1}: Could not parse stats reliably: {e_stat}. Assuming 0 for safety (will attempt delete if other conditions met).")
-
-
-                if replies == 0 and reposts == 0 and likes == 0:
-                    st.write(f"[{tab_name}] Article {idx+1}: Conditions met for deletion (0 engagement). Clicking 'Delete' option...")
-                    try:
-                        # Click the "Delete" menu item
-                        driver.execute_script("arguments[0].click();", delete_menu_item) # JS click often better for menu items
-                        # ActionChains(driver).move_to_element(delete_menu_item).click().perform()
-                        time.sleep(0.8) # Wait for confirmation dialog
-
-                        st.write(f"[{tab_name}] Article {idx+1}: Clicked 'Delete'. Waiting for confirmation button...")
-                        confirm_button_xpath = '//div[@data-testid="confirmationSheetConfirm"]'
-                        confirm_button = WebDriverWait(driver, 10).until(
-                            EC.element_to_be_clickable((By.XPATH, confirm_button_xpath))
-                        )
-                        st.write(f"[{tab_name}] Article {idx+1}: Confirmation button found. Clicking confirm...")
-                        driver.execute_script("arguments[0].click();", confirm_button) # JS click
-                        # ActionChains(driver).move_to_element(confirm_button).click().perform()
-                        
-                        st.success(f"[{tab_name}] Article {idx+1}: DELETED '{tweet_text_preview}...'.")
+                    progress.write(f"Processing Article {idx+1} (ID: {article_id_for_check.split('/')[-1]}): '{tweet_text_preview}...'")
+                    # The rules were already evaluated in pass 1, so every candidate here matches them.
+                    pacer.wait(progress)
+                    with progress.metrics.item():
+                        verdict = delete_candidate(driver, article_element, article_id_for_check, idx, tab_name, progress)
+                    if pacer.record(verdict == DELETED, last_mutation_response(driver), progress) and verdict == FAILED:
+                        # Rate limited: the article is still on the page, so retry it once at the slower pace
+                        pacer.wait(progress)
+                        with progress.metrics.item():
+                            verdict = delete_candidate(driver, article_element, article_id_for_check, idx, tab_name, progress)
+                        pacer.record(verdict == DELETED, last_mutation_response(driver), progress)
+                    settle(article_id_for_check, status_id, verdict)
+                    if verdict == DELETED:
+                        progress.success(f"[{tab_name}] Article {idx+1}: DELETED '{tweet_text_preview}...'.")
                         deleted_count += 1
                         empty_scrolls_in_a_row = 0 # Reset since an action was taken
-                        time.sleep(2.0) # Wait for UI to update after deletion
-                        
-                        st.write(f"[{tab_name}] Breaking from article loop to refresh list after deletion.")
-                        break # Break from the for loop (articles_on_page) to get a fresh list
-                    except Exception as e_final_delete:
-                        st.error(f"[{tab_name}] Article {idx+1}: Error during final delete/confirmation: {e_final_delete}")
-                        # driver.save_screenshot(f"debug_final_delete_fail_article_{idx+1}_{tab_name}.png")
-                        # st.image(f"debug_final_delete_fail_article_{idx+1}_{tab_name}.png")
-                        driver.execute_script("document.body.click();") # Try to dismiss dialog
-                        time.sleep(0.5)
-                else:
-                    st.info(f"[{tab_name}] Article {idx+1}: Not deleting (engagement: R:{replies}, RP:{reposts}, L:{likes}). Closing menu.")
-                    driver.execute_script("document.body.click();") # Click away to close "More" menu
-                    time.sleep(0.5)
-                
-                checked_article_ids.add(article_id_for_check)
-
-            except StaleElementReferenceException:
-                st.warning(f"[{tab_name}] Article {idx+1} became stale. Breaking to refresh article list.")
-                break 
-            except Exception as e_article_loop:
-                st.error(f"[{tab_name}] Unexpected error processing article {idx+1}: {e_article_loop}")
-                # driver.save_screenshot(f"debug_article_loop_error_article_{idx+1}_{tab_name}.png")
-                # st.image(f"debug_article_loop_error_article_{idx+1}_{tab_name}.png")
-                driver.execute_script("document.body.click();") 
-                time.sleep(0.5)
-                checked_article_ids.add(article_id_for_check) # Add to checked to prevent re-processing same error
-                continue 
-            
-            # If a deletion happened, the 'break' inside the loop would have occurred.
-            # If loop completed without break (no deletion), then check if we processed new articles.
-            if idx == len(articles_on_page) - 1 and new_articles_processed_this_pass == 0 and articles_on_page:
-                # Reached end of current article list, and all were already checked ones.
-                st.write(f"All {len(articles_on_page)} articles on this pass were already processed. Incrementing empty scroll.")
-                empty_scrolls_in_a_row +=1
+                        # No re-query needed: the remaining candidates are still live elements
 
+                except StaleElementReferenceException:
+                    # X dropped this node for good; let the queue pick the article up again if it is re-rendered
+                    progress.warning(f"[{tab_name}] Article {idx+1} became stale. It will be re-queued if it comes back into view.")
+                    forget_article(driver, article_id_for_check)
+                    continue
+                except Exception as e_article_loop:
+                    progress.error(f"[{tab_name}] Unexpected error processing article {idx+1}: {e_article_loop}")
+                    # driver.save_screenshot(f"debug_article_loop_error_article_{idx+1}_{tab_name}.png")
+                    # st.image(f"debug_article_loop_error_article_{idx+1}_{tab_name}.png")
+                    close_open_menu(driver)
+                    settle(article_id_for_check, status_id, FAILED) # Add to checked to prevent re-processing same error
+                    continue 
 
         except TimeoutException: 
-            st.warning(f"[{tab_name}] Timed out waiting for initial articles on pass. Empty scroll count: {empty_scrolls_in_a_row + 1}")
+            progress.warning(f"[{tab_name}] Timed out waiting for initial articles on pass. Empty scroll count: {empty_scrolls_in_a_row + 1}")
             empty_scrolls_in_a_row += 1
         except Exception as e_outer_loop:
-            st.error(f"[{tab_name}] Critical error in main processing loop for {tab_name}: {e_outer_loop}")
+            progress.error(f"[{tab_name}] Critical error in main processing loop for {tab_name}: {e_outer_loop}")
             # driver.save_screenshot(f"debug_critical_error_{tab_name}.png")
             # st.image(f"debug_critical_error_{tab_name}.png")
             break 
 
+        if remaining_candidates is not None and not remaining_candidates:
+            progress.info(f"[{tab_name}] Every planned candidate has been handled. Stopping the scan early.")
+            break
+
+        if watermark and below_watermark >= WATERMARK_STOP_AFTER:
+            progress.info(f"[{tab_name}] Reached posts settled in earlier runs (status {watermark.newest} or older). Stopping the scan early.")
+            watermark.complete = True
+            break
+
         if empty_scrolls_in_a_row >= max_empty_scrolls:
-             st.info(f"[{tab_name}] Reached max empty scrolls ({max_empty_scrolls}). Assuming end of content for '{tab_name}'.")
+             progress.info(f"[{tab_name}] Reached max empty scrolls ({max_empty_scrolls}). Assuming end of content for '{tab_name}'.")
+             if watermark:
+                 watermark.complete = True
              break
 
-        st.write(f"[{tab_name}] Scrolling down. Attempt {scroll_attempts + 1}, Empty Scrolls: {empty_scrolls_in_a_row}...")
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(3.5) 
-        scroll_attempts += 1
+        progress.debug(f"[{tab_name}] Scrolling down. Attempt {scroll_attempts + 1}, Empty Scrolls: {empty_scrolls_in_a_row}...")
+        with progress.metrics.phase("scroll"):
+            discard_network_log(driver)
+            scroll_and_wait_for_new_articles(driver, timeout=8)
+        if not (catching_up or rewalking): # Re-covering ground already walked doesn't count against the cap
+            scroll_attempts += 1
         
         if scroll_attempts > 70: # Increased safety break
-            st.warning(f"[{tab_name}] Reached {scroll_attempts} scroll attempts. Stopping this tab to prevent infinite loop.")
+            progress.warning(f"[{tab_name}] Reached {scroll_attempts} scroll attempts. Stopping this tab to prevent infinite loop.")
+            if watermark:
+                watermark.capped = True # Saves the range covered, so the next walk can go on below it
             break
 
-    st.success(f"Finished processing '{tab_name}'. Total deleted in this session for this tab: {deleted_count}")
-    return deleted_count
+    if sink or dry_run:
+        progress.success(f"Finished scanning '{tab_name}'. 'More' menu openings avoided: {menus_avoided}. Skipped as settled in earlier runs: {resumed_skips}")
+        return deleted_count, menus_avoided
+    progress.success(f"Finished processing '{tab_name}'. Total deleted in this session for this tab: {deleted_count}. 'More' menu openings avoided: {menus_avoided}. Skipped as settled in earlier runs: {resumed_skips}")
+    return deleted_count, menus_avoided
+
+def delete_tweets_by_id(driver, status_ids, store=None, base_url=X_BASE_URL, progress=None, pacer=None, rules=None, dry_run=False, kinds=None):
+    # Direct mode: open /i/web/status/<id> for each planned id instead of walking the profile
+    # timeline, so the cost per item no longer depends on how deep the tweet sits. kinds limits
+    # it to "posts" and/or "replies"; the others are skipped without a verdict, as on a walk.
+    progress = progress or RunProgress(log_file=None)
+    pacer = pacer or PacingController()
+    rules = rules or compile_rules(DEFAULT_RULES)
+    # status_ids may also be an open-ended iterator (the pipelined mode's queue)
+    total = len(status_ids) if hasattr(status_ids, "__len__") else None
+    if total is not None:
+        progress.set_total(total)
+    outcomes = {}
+    for n, status_id in enumerate(status_ids):
+        progress.checkpoint()
+        if total is not None: # Fed by a timeline scan, the scanner already counted it
+            progress.count("scanned")
+        if store and store.is_settled(rules.scope, status_id):
+            outcomes[status_id] = "skipped"
+            progress.count("skipped")
+            continue
+        label = f"Status {status_id}"
+        progress.debug(f"[{n+1}/{total or '?'}] Opening {label}")
+        try:
+            focal_xpath = f'//article[@data-testid="tweet"][.//a[contains(@href,"/status/{status_id}") and .//time]]'
+            with progress.metrics.phase("navigate"):
+                discard_network_log(driver) # The last page's events, see network_confirm
+                driver.get(f"{base_url}/i/web/status/{status_id}")
+                focal = wait_for_element(driver, focal_xpath, timeout=10)
+            if not focal:
+                if "doesn’t exist" in driver.page_source or "doesn't exist" in driver.page_source:
+                    progress.info(f"[{label}] Already gone.")
+                    verdict = DELETED
+                else:
+                    progress.warning(f"[{label}] Tweet did not load. Skipping.")
+                    verdict = FAILED
+            else:
+                article = next((a for a in extract_articles(driver) if a["status_id"] == status_id), None)
+                if article:
+                    # A status page shows a reply under the tweet it answers, without a "Replying to" line
+                    article["is_reply"] = classify_reply(article, handle_from_href(article["href"]))
+                    if kinds and ("replies" if article["is_reply"] else "posts") not in kinds:
+                        progress.debug(f"[{label}] Not selected by this action. Skipping.")
+                        outcomes[status_id] = "skipped"
+                        progress.count("skipped")
+                        continue
+                # The plan may be stale (archive counts are from export time), so re-check the rules live
+                match = rules.check(article) if article else None
+                if article is None:
+                    verdict = FAILED
+                elif match is None:
+                    progress.warning(f"[{label}] Could not read stats/date reliably. Skipping to be safe.")
+                    verdict = FAILED
+                elif not match:
+                    progress.info(f"[{label}] Not deleting (doesn't match the rules; engagement: R:{article['replies']}, RP:{article['reposts']}, L:{article['likes']}).")
+                    verdict = KEPT
+                elif dry_run:
+                    progress.count("matched")
+                    progress.info(f"[{label}] would delete '{article['text_preview']}...'")
+                    outcomes[status_id] = "matched"
+                    continue
+                else:
+                    if total is not None: # Fed by a timeline scan, the scanner already counted the match
+                        progress.count("matched")
+                    pacer.wait(progress)
+                    with progress.metrics.item():
+                        verdict = delete_via_more_menu(driver, article["element"], 0, label, progress, status_id)
+                    if pacer.record(verdict == DELETED, last_mutation_response(driver), progress) and verdict == FAILED:
+                        # Rate limited: the tweet is still open, so retry it once at the slower pace
+                        pacer.wait(progress)
+                        with progress.metrics.item():
+                            verdict = delete_via_more_menu(driver, article["element"], 0, label, progress, status_id)
+                        pacer.record(verdict == DELETED, last_mutation_response(driver), progress)
+                    if verdict == DELETED:
+                        progress.success(f"[{label}] DELETED '{article['text_preview']}...'.")
+        except Exception as e_status:
+            progress.error(f"[{label}] Unexpected error: {e_status}")
+            verdict = FAILED
+        outcomes[status_id] = verdict
+        progress.record(verdict)
+        if store and not dry_run:
+            store.record(rules.scope, status_id, verdict)
+    return outcomes
+
+def delete_empty_tweets_pipelined(driver, worker_driver, tab_name, store=None, candidate_ids=None, progress=None, pacer=None, base_url=X_BASE_URL, rules=None, watermark=None, kinds=None, seen=None, health=None):
+    # Scan-ahead / delete-behind: `driver` walks the timeline and only reads stats, `worker_driver`
+    # (a second logged-in browser, see session_core.clone_session) deletes the queued ids from their
+    # status pages. The scan only waits when the queue is full, and deletes no longer disturb the
+    # timeline it is reading. Returns (deleted_count, menus_avoided) like delete_empty_tweets_in_tab.
+    progress = progress or RunProgress(log_file=None)
+    pacer = pacer or PacingController()
+    rules = rules or compile_rules(DEFAULT_RULES)
+    pending = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    outcomes = {}
+    failure = [] # Whatever stopped the deleting thread (including JobCancelled), re-raised here
+
+    def queued_ids():
+        while True:
+            status_id = pending.get()
+            if status_id is None:
+                return
+            yield status_id
+
+    def consume():
+        try:
+            outcomes.update(delete_tweets_by_id(worker_driver, queued_ids(), store, base_url, progress, pacer, rules))
+        except BaseException as e:
+            failure.append(e)
+
+    def sink(status_id):
+        while True:
+            if failure:
+                raise failure[0]
+            try:
+                pending.put(status_id, timeout=0.5)
+                return
+            except queue.Full:
+                progress.checkpoint()
+
+    consumer = threading.Thread(target=consume, name=f"delete-behind-{tab_name}", daemon=True)
+    consumer.start()
+    try:
+        _, menus_avoided = delete_empty_tweets_in_tab(driver, tab_name, store, candidate_ids, progress, pacer, sink, rules, watermark=watermark, kinds=kinds, seen=seen, health=health)
+    finally:
+        # Let the deleting side finish what is queued (unless it already stopped), then end it
+        while consumer.is_alive():
+            try:
+                pending.put(None, timeout=0.5)
+                break
+            except queue.Full:
+                continue
+        consumer.join()
+    if failure:
+        raise failure[0]
+    if watermark:
+        for status_id, verdict in outcomes.items():
+            if verdict in SETTLED_VERDICTS or verdict == "skipped":
+                watermark.settle(status_id)
+    return sum(1 for v in outcomes.values() if v == DELETED), menus_avoided
+
+def run_tweet_cleanup(driver, action_choice, candidate_ids=None, direct_mode=False, resume=True, progress=None, make_worker_driver=None, rules=None, dry_run=False, incremental=False):
+    # One whole deletion run (runs in the background job); returns the summary shown when it ends.
+    # With make_worker_driver (pipelined mode), deletes run in that second browser behind the scan.
+    # With dry_run (the rules preview), nothing is deleted and the checkpoint isn't touched.
+    # With incremental, timeline walks stop at the watermark left by the last complete walk.
+    progress = progress or RunProgress(log_file=None)
+    rules = rules or compile_rules(DEFAULT_RULES)
+    progress.metrics.tool = "tweets"
+    progress.metrics.attach(driver) # Count WebDriver commands per item for the run report
+    pacer = PacingController() # One pacing state for the whole run, across both tabs
+    store = CheckpointStore(CHECKPOINT_FILE)
+    worker_driver = None
+    try:
+        if not resume and not dry_run:
+            store.clear(rules.scope)
+        progress.write(f"Rules: {rules.description}. Checkpoint verdicts so far: {store.counts(rules.scope) or 'none'}")
+        summary = {}
+        if direct_mode:
+            progress.info("--- Deleting planned ids straight from their status pages ---")
+            outcomes = delete_tweets_by_id(driver, candidate_ids, store, progress=progress, pacer=pacer, rules=rules, dry_run=dry_run, kinds=action_kinds(action_choice))
+            for verdict, count in sorted(Counter(outcomes.values()).items()):
+                summary[f"Planned ids {verdict}"] = count
+            summary["Total planned tweets deleted"] = sum(1 for v in outcomes.values() if v == DELETED)
+        else:
+            total_menus_avoided = 0
+            if make_worker_driver:
+                progress.info("Starting a second browser for pipelined deletes...")
+                worker_driver = make_worker_driver()
+                progress.metrics.attach(worker_driver, "worker")
+            seen = set() # Permalinks handled so far this run, shared by every walk
+            health = BrowserHealth(driver) # Reloads the timeline when Chrome's heap/DOM grows too big
+            for tab_name, kinds in plan_walks(action_choice):
+                label = " & ".join(kind.capitalize() for kind in kinds)
+                progress.info(f"--- Processing {label} from the '{tab_name}' tab ---")
+                matched_before = progress.counters()["matched"]
+                # A planned list skips everything outside it, so such a walk can't move the watermark.
+                # Keyed by what the walk selects: a replies-only walk settles nothing about posts.
+                watermark = Watermark(store, rules.scope, label) if incremental and candidate_ids is None else None
+                if worker_driver:
+                    deleted, menus_avoided = delete_empty_tweets_pipelined(driver, worker_driver, tab_name, store, candidate_ids, progress, pacer, rules=rules, watermark=watermark, kinds=kinds, seen=seen, health=health)
+                else:
+                    deleted, menus_avoided = delete_empty_tweets_in_tab(driver, tab_name, store, candidate_ids, progress, pacer, rules=rules, dry_run=dry_run, watermark=watermark, kinds=kinds, seen=seen, health=health)
+                if watermark and not dry_run:
+                    watermark.save()
+                if dry_run:
+                    matched = progress.counters()["matched"] - matched_before
+                    progress.success(f"Finished {label}. Would delete: {matched}")
+                    summary[f"{label} matching the rules"] = matched
+                else:
+                    progress.success(f"Finished {label}. Deleted: {deleted}")
+                    summary[f"Total {label} deleted"] = deleted
+                total_menus_avoided += menus_avoided
+            summary["'More' menu openings avoided (engagement read first)"] = total_menus_avoided
+            summary["Timeline reloads to free browser memory"] = health.reloads
+        summary["Rules"] = rules.description
+        summary["Checkpoint verdicts"] = store.counts(rules.scope)
+        return summary
+    finally:
+        if worker_driver:
+            worker_driver.quit()
+        selector_registry().save() # Persist hit/miss counts along with the ranking
+        store.close()
+        progress.metrics.detach()
+        progress.metrics.write_reports(progress.counters())
+
+def rules_form():
+    # Builds the deletion rules (rules.py); returns the compiled RuleSet, or None if the input is invalid
+    import streamlit as st
+
+    with st.expander("Deletion rules (all set criteria must hold)", expanded=True):
+        zero_engagement = st.checkbox("Only items with no replies, reposts or likes", value=True, help="The default. Untick to set the limits yourself.")
+        if zero_engagement:
+            spec = dict(DEFAULT_RULES)
+        else:
+            columns = st.columns(3)
+            spec = {
+                "max_replies": columns[0].number_input("At most N replies", min_value=0, value=None, step=1, help="Empty = any"),
+                "max_reposts": columns[1].number_input("At most N reposts", min_value=0, value=None, step=1, help="Empty = any"),
+                "max_likes": columns[2].number_input("At most N likes", min_value=0, value=None, step=1, help="Empty = any"),
+            }
+        columns = st.columns(3)
+        spec["older_than_days"] = columns[0].number_input("Older than N days", min_value=0, value=None, step=1, help="Empty = any age")
+        spec["newer_than_days"] = columns[1].number_input("Newer than N days", min_value=1, value=None, step=1, help="Empty = any age")
+        spec["has_media"] = {"Any": None, "With media": True, "Without media": False}[
+            columns[2].selectbox("Media", ("Any", "With media", "Without media"))
+        ]
+        # No "kind" criterion here: the action above already picks posts and/or replies
+        columns = st.columns(2)
+        spec["text_contains"] = columns[0].text_input("Text contains (case-insensitive)")
+        spec["text_regex"] = columns[1].text_input("Text matches regex (case-insensitive)")
+        try:
+            rules = compile_rules(spec)
+        except ValueError as e:
+            st.error(str(e))
+            return None
+        if not rules.checks:
+            st.warning("No criteria set: every post and reply will match.")
+        st.caption(f"Will match: {rules.description}. Use Preview to see match counts before deleting.")
+        return rules
 
 def main():
+    # Streamlit is only imported by the UI, so cleanup_cli.py can run the cleanup functions without it
+    import streamlit as st
+
     st.set_page_config(layout="wide")
     st.title("X/Twitter Bulk Deletion Tool 🐦🗑️ v2")
     st.markdown("""
-    This tool attempts to delete your items on X/Twitter that have zero engagement.
+    This tool attempts to delete your items on X/Twitter that match your deletion rules (by default: zero engagement).
     **USE WITH EXTREME CAUTION. Deletions are permanent.**
     Requires your X/Twitter cookies as `twitter_cookies.json`.
     Enable screenshots (uncomment `driver.save_screenshot` lines) in the code for debugging if issues occur.
@@ -432,69 +802,93 @@ def main():
         # ... (cookie export instructions - kept concise for brevity here)
         return
 
-    if "logged_in" not in st.session_state: st.session_state.logged_in = False
-    if "driver" not in st.session_state: st.session_state.driver = None
+    # Driver and job live in the shared runner, not st.session_state, so a running job keeps going
+    # (and can be watched again) after a rerun, a closed tab or a reconnect
+    runner = shared_runner("tweets")
 
-    if not st.session_state.logged_in:
+    if runner.driver is None:
+        lean = st.checkbox("Lean mode: small window, no images/video/fonts, no autoplay or animations")
+        headless = st.checkbox("Run headless (fastest, but more likely to be flagged as a bot)", disabled=not lean)
         if st.button("Start Session with Cookies 🍪"):
             with st.spinner("🚀 Launching browser & loading cookies..."):
-                driver_instance = initialize_driver()
-                if not driver_instance:
+                try:
+                    driver_instance = initialize_driver(cached_driver_factory(), lean=lean, headless=lean and headless, log=st.warning)
+                except Exception as e:
+                    st.error(f"Failed to initialize Chrome WebDriver: {e}")
+                    st.error("This might be due to an issue with ChromeDriverManager or your Chrome installation.")
+                    st.info("Consider: \n1. Ensuring Chrome is installed and up to date. \n2. Checking your internet connection. \n3. If behind a proxy, ChromeDriverManager might need proxy settings.")
                     st.error("Browser initialization failed. Cannot proceed.")
                     return
                 
-                st.session_state.driver = driver_instance
-                load_cookies(st.session_state.driver, COOKIE_FILE)
-                
-                if is_logged_in(st.session_state.driver):
+                if start_session(driver_instance, COOKIE_FILE, log=st.write):
                     st.success("🎉 Logged in with cookies!")
-                    st.session_state.logged_in = True
+                    runner.driver = driver_instance
+                    runner.driver_options = {"lean": lean, "headless": lean and headless} # Reused for a pipelined second browser
                 else:
                     st.error("❌ Login FAILED. Cookies might be old/invalid or login check needs update.")
-                    if st.session_state.driver: st.session_state.driver.quit()
-                    st.session_state.driver = None
+                    driver_instance.quit()
     
-    if st.session_state.logged_in and st.session_state.driver:
+    if runner.driver:
         st.success("✅ Logged In. Browser session active.")
-        
-        action_choice = st.radio(
-            "Delete items with 0 replies, 0 reposts, 0 likes:",
-            ("Only My Posts", "Only My Replies", "Both My Posts & My Replies"),
-            index=None, key="action_choice"
-        )
 
-        if action_choice:
-            st.warning(f"🚨 Confirm Deletion: **{action_choice}**. This is irreversible.")
-            confirm_delete = st.checkbox(f"I understand and want to delete '{action_choice}'.")
-            
-            if st.button(f"🚀 Start Deleting: {action_choice}", disabled=not confirm_delete, type="primary"):
-                total_deleted_posts = 0
-                total_deleted_replies = 0
-
-                if "Posts" in action_choice or "Both" in action_choice:
-                    st.info("--- Processing 'Posts' tab ---")
-                    with st.spinner("🗑️ Working on Posts..."):
-                        deleted_posts = delete_empty_tweets_in_tab(st.session_state.driver, "Posts")
-                        total_deleted_posts += deleted_posts
-                    st.success(f"Finished 'Posts'. Deleted: {deleted_posts}")
-
-                if "Replies" in action_choice or "Both" in action_choice:
-                    st.info("--- Processing 'Replies' tab ---")
-                    with st.spinner("🗑️ Working on Replies..."):
-                        deleted_replies = delete_empty_tweets_in_tab(st.session_state.driver, "Replies")
-                        total_deleted_replies += deleted_replies
-                    st.success(f"Finished 'Replies'. Deleted: {deleted_replies}")
+        if runner.job:
+            # A job is running (or finished and not yet dismissed): only poll it
+            render_job_panel(runner)
+            st.caption(f"Full log: {LOG_FILE} · Timing report: {METRICS_REPORT.format(tool='tweets')}, {PROMETHEUS_FILE.format(tool='tweets')}")
+        else:
+            action_choice = st.radio(
+                "Delete items from:",
+                ("Only My Posts", "Only My Replies", "Both My Posts & My Replies"),
+                index=None, key="action_choice"
+            )
+            rules = rules_form()
+
+            if action_choice and rules:
+                st.warning(f"🚨 Confirm Deletion: **{action_choice}**. This is irreversible.")
+                confirm_delete = st.checkbox(f"I understand and want to delete '{action_choice}'.")
+                resume = st.checkbox(f"Resume from checkpoint '{CHECKPOINT_FILE}' (skip items settled in earlier runs)", value=True)
+                incremental = resume and st.checkbox(
+                    "Incremental: stop scrolling once the walk reaches posts settled by the last complete run", value=True
+                )
+                candidate_file = st.file_uploader(
+                    "Optional: candidate id list from archive_planner.py (only these ids will be considered)", type=["txt"]
+                )
+                candidate_ids = read_candidate_ids(candidate_file) if candidate_file else None
+                direct_mode = False
+                if candidate_ids is not None:
+                    st.caption(f"Loaded {len(candidate_ids)} planned candidate ids.")
+                    direct_mode = st.checkbox(
+                        "Direct mode: open each planned id's status page instead of scrolling the profile timeline", value=True
+                    )
+                pipelined = not direct_mode and st.checkbox(
+                    "Pipelined mode: scan the timeline here and delete from a second browser at the same time"
+                )
                 
-                st.balloons()
-                st.header(f"🎉 Deletion Process Finished! 🎉")
-                st.write(f"Total Posts deleted: {total_deleted_posts}")
-                st.write(f"Total Replies deleted: {total_deleted_replies}")
+                if st.button(f"🔍 Preview matches: {action_choice} (nothing is deleted)"):
+                    driver = runner.driver
+                    runner.start(
+                        f"Preview: {action_choice}",
+                        lambda progress: run_tweet_cleanup(driver, action_choice, candidate_ids, direct_mode, resume, progress, rules=rules, dry_run=True, incremental=incremental),
+                        RunProgress(),
+                    )
+                    st.rerun()
+
+                if st.button(f"🚀 Start Deleting: {action_choice}", disabled=not confirm_delete, type="primary"):
+                    driver = runner.driver
+                    make_worker_driver = None
+                    if pipelined:
+                        factory = cached_driver_factory() # Resolved here, in the script thread
+                        make_worker_driver = lambda: clone_session(driver, factory, **runner.driver_options)
+                    runner.start(
+                        action_choice,
+                        lambda progress: run_tweet_cleanup(driver, action_choice, candidate_ids, direct_mode, resume, progress, make_worker_driver, rules, incremental=incremental),
+                        RunProgress(),
+                    )
+                    st.rerun()
         
-        if st.button("🚪 End Session & Close Browser"):
+        if st.button("🚪 End Session & Close Browser", disabled=runner.busy()):
             with st.spinner("Shutting down..."):
-                if st.session_state.driver: st.session_state.driver.quit()
-            st.session_state.driver = None
-            st.session_state.logged_in = False
+                runner.close_driver()
             st.info("Session ended. Refresh page to restart.")
             time.sleep(1); st.rerun()
 
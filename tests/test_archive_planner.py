@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from archive_planner import iter_archive_entries, plan_tweet_deletions, read_candidate_ids
+
+def write_archive(path, entries, name="tweets"):
+    path.write_text(f"window.YTD.{name}.part0 = " + json.dumps(entries, indent=2), encoding="utf-8")
+    return str(path)
+
+def tweet(status_id, likes=0, reply=False, text="hello"):
+    return {"tweet": {
+        "id_str": status_id, "favorite_count": str(likes), "retweet_count": "0", "full_text": text,
+        "created_at": "Mon Jan 01 00:00:00 +0000 2024", "in_reply_to_status_id_str": "1" if reply else None,
+    }}
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 16])
+def test_entries_survive_any_chunk_boundary(tmp_path, chunk_size):
+    entries = [tweet(str(i), text="brackets ] and [ and, commas") for i in range(20)]
+    path = write_archive(tmp_path / "tweets.js", entries)
+    assert list(iter_archive_entries(path, chunk_size)) == entries
+
+def test_empty_archive(tmp_path):
+    assert list(iter_archive_entries(write_archive(tmp_path / "tweets.js", []), 4)) == []
+
+def test_truncated_archive(tmp_path):
+    path = tmp_path / "tweets.js"
+    path.write_text('window.YTD.tweets.part0 = [{"tweet": {"id_str": "1"}}, {"tweet": {"id_', encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_archive_entries(str(path), 8))
+
+def test_plan_tweet_deletions(tmp_path):
+    path = write_archive(tmp_path / "tweets.js", [
+        tweet("1"), tweet("2", likes=3), tweet("3", reply=True), tweet("4", text="RT @someone: hi"),
+    ])
+    assert list(plan_tweet_deletions(path)) == ["1", "3"]
+    assert list(plan_tweet_deletions(path, kind="replies")) == ["3"]
+    assert list(plan_tweet_deletions(path, zero_engagement=False, kind="posts")) == ["1", "2"]
+
+def test_read_candidate_ids():
+    assert read_candidate_ids(["12\n", "# comment\n", "", "34 # note\n", b"12\n", "abc\n"]) == ["12", "34"]
@@ -0,0 +1,72 @@
+import pytest
+
+import browser_health
+from browser_health import MB, BrowserHealth
+from streamlit_app import resume_url
+
+class MetricsDriver:
+    # Reports whatever heap/node figures the test sets; records the pages it was sent to
+    current_url = "https://x.com/me/with_replies"
+
+    def __init__(self, heap_mb=100, nodes=1000):
+        self.heap = heap_mb * MB
+        self.nodes = nodes
+        self.visited = []
+
+    def execute_cdp_cmd(self, command, params):
+        return {"metrics": [{"name": "JSHeapUsedSize", "value": self.heap}, {"name": "Nodes", "value": self.nodes}]}
+
+    def get(self, url):
+        self.visited.append(url)
+
+@pytest.fixture(autouse=True)
+def no_wait(monkeypatch):
+    monkeypatch.setattr(browser_health, "wait_for_element", lambda *args, **kwargs: object())
+
+def test_thresholds():
+    driver = MetricsDriver()
+    health = BrowserHealth(driver, heap_limit_mb=512, node_limit=10_000, sample_interval=0)
+    assert health.over_limit() is None
+    driver.heap = 600 * MB
+    assert "JS heap" in health.over_limit()
+    driver.heap, driver.nodes = 100 * MB, 20_000
+    assert "DOM nodes" in health.over_limit()
+
+def test_samples_once_per_interval():
+    driver = MetricsDriver(heap_mb=600)
+    health = BrowserHealth(driver, sample_interval=3600)
+    assert health.over_limit()
+    assert health.over_limit() is None
+
+def test_no_second_reload_before_the_walk_moves_on():
+    driver = MetricsDriver(heap_mb=600)
+    health = BrowserHealth(driver, sample_interval=0)
+    assert health.over_limit()
+    health.reload()
+    assert health.over_limit() is None
+    health.advance()
+    assert health.over_limit()
+
+def test_reload_cap():
+    driver = MetricsDriver(heap_mb=600)
+    health = BrowserHealth(driver, sample_interval=0, max_reloads=2)
+    for _ in range(2):
+        health.advance()
+        assert health.over_limit()
+        health.reload()
+    health.advance()
+    assert health.exhausted
+    assert health.over_limit() is None
+    assert health.reloads == 2
+
+def test_reload_opens_the_given_url():
+    driver = MetricsDriver()
+    health = BrowserHealth(driver)
+    health.reload("https://x.com/search?q=x")
+    health.reload()
+    assert driver.visited == ["https://x.com/search?q=x", MetricsDriver.current_url]
+
+def test_resume_url():
+    assert resume_url("me", "1000") == "https://x.com/search?q=from%3Ame%20max_id%3A999&src=typed_query&f=live"
+    assert resume_url(None, "1000") is None
+    assert resume_url("me", None) is None
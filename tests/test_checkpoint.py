@@ -0,0 +1,86 @@
+import sqlite3
+
+import pytest
+
+from checkpoint import DELETED, FAILED, KEPT, CheckpointStore, Watermark
+
+@pytest.fixture
+def store(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoint.db"))
+    yield store
+    store.close()
+
+def walk(watermark, ids):
+    # Feeds ids newest first, like a timeline walk; returns how many in a row reached the watermark
+    below = 0
+    for status_id in ids:
+        below = below + 1 if watermark.reached(status_id) else 0
+    return below
+
+def test_verdicts(store):
+    store.record("tweets", "1", KEPT)
+    store.record("tweets", "2", FAILED)
+    assert store.is_settled("tweets", "1")
+    assert not store.is_settled("tweets", "2")
+    store.record("tweets", "2", DELETED)
+    assert store.counts("tweets") == {KEPT: 1, DELETED: 1}
+
+def test_interrupted_walk_saves_nothing(store):
+    watermark = Watermark(store, "tweets", "Posts")
+    walk(watermark, [300, 200])
+    watermark.save()
+    assert store.watermark("tweets", "Posts") == (None, None, None, None)
+
+def test_complete_walk_moves_the_watermark(store):
+    watermark = Watermark(store, "tweets", "Posts")
+    walk(watermark, [300, 200, 100])
+    watermark.leave_open(200)
+    watermark.complete = True
+    watermark.save()
+
+    watermark = Watermark(store, "tweets", "Posts")
+    assert (watermark.newest, watermark.open_floor) == (300, 200)
+    # Stops only below the oldest item left open
+    assert walk(watermark, [400, 300, 250]) == 0
+    assert walk(watermark, [150, 120, 100]) == 3
+
+def test_capped_walk_keeps_the_boundary_and_records_its_range(store):
+    watermark = Watermark(store, "tweets", "Posts")
+    walk(watermark, [100, 90])
+    watermark.complete = True
+    watermark.save()
+
+    watermark = Watermark(store, "tweets", "Posts")
+    walk(watermark, [500, 400, 300])
+    watermark.capped = True
+    watermark.save()
+    watermark = Watermark(store, "tweets", "Posts")
+    assert (watermark.newest, watermark.walked_top, watermark.walked_floor) == (100, 500, 300)
+    assert watermark.walked(400) and not watermark.walked(200)
+
+    # A second capped walk that ran on into the range extends it
+    walk(watermark, [600, 500, 300, 200])
+    watermark.capped = True
+    watermark.save()
+    watermark = Watermark(store, "tweets", "Posts")
+    assert (watermark.newest, watermark.walked_top, watermark.walked_floor) == (100, 600, 200)
+
+    # Reaching the boundary clears the range
+    walk(watermark, [700, 150, 100, 90])
+    watermark.complete = True
+    watermark.save()
+    assert store.watermark("tweets", "Posts") == ("700", None, None, None)
+
+def test_opens_checkpoints_without_the_walked_range(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE watermarks (scope TEXT NOT NULL, timeline TEXT NOT NULL, newest TEXT, open_floor TEXT,"
+        " updated_at REAL NOT NULL, PRIMARY KEY (scope, timeline))"
+    )
+    conn.execute("INSERT INTO watermarks VALUES ('tweets', 'Posts', '100', NULL, 0)")
+    conn.commit()
+    conn.close()
+    store = CheckpointStore(path)
+    assert store.watermark("tweets", "Posts") == ("100", None, None, None)
+    store.close()
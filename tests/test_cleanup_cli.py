@@ -0,0 +1,10 @@
+import pytest
+
+from cleanup_cli import main
+
+@pytest.mark.parametrize("target", ["posts", "replies", "both"])
+def test_empty_rule_set_needs_all(target, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main([target, "--any-engagement"])
+    assert exit_info.value.code == 2
+    assert "--all" in capsys.readouterr().err
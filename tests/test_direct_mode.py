@@ -0,0 +1,48 @@
+import pytest
+
+import streamlit_app
+from extractor import _to_article
+from progress import RunProgress
+from rules import compile_rules
+
+class StatusPage:
+    # Just enough of a driver for delete_tweets_by_id: every page is the status page of a reply
+    # shown under the tweet it answers, without a "Replying to" line
+    page_source = ""
+
+    def get(self, url):
+        pass
+
+    def get_log(self, kind):
+        return []
+
+def reply_status_page(driver):
+    parent = {"idx": 0, "element": None, "href": "https://x.com/someone/status/100", "timestamp": "2024-01-01T00:00:00.000Z"}
+    reply = {
+        "idx": 1, "element": None, "href": "https://x.com/me/status/200", "timestamp": "2024-01-02T00:00:00.000Z",
+        "is_reply": False, "above_href": parent["href"], "replies": "", "reposts": "", "likes": "",
+    }
+    return [_to_article(parent), _to_article(reply)]
+
+@pytest.fixture
+def status_page(monkeypatch):
+    monkeypatch.setattr(streamlit_app, "wait_for_element", lambda *args, **kwargs: object())
+    monkeypatch.setattr(streamlit_app, "extract_articles", reply_status_page)
+    return StatusPage()
+
+@pytest.mark.parametrize("kind, outcome", [("replies", "matched"), ("posts", "kept")])
+def test_reply_without_replying_to_line_is_classified_as_reply(status_page, kind, outcome):
+    rules = compile_rules({"kind": kind})
+    outcomes = streamlit_app.delete_tweets_by_id(status_page, ["200"], progress=RunProgress(log_file=None), rules=rules, dry_run=True)
+    assert outcomes == {"200": outcome}
+
+def test_action_kinds():
+    assert streamlit_app.action_kinds("Only My Posts") == ("posts",)
+    assert streamlit_app.action_kinds("Only My Replies") == ("replies",)
+    assert set(streamlit_app.action_kinds("Both My Posts & My Replies")) == {"posts", "replies"}
+
+def test_reply_outside_the_action_is_skipped_without_a_verdict(status_page):
+    outcomes = streamlit_app.delete_tweets_by_id(
+        status_page, ["200"], progress=RunProgress(log_file=None), rules=compile_rules({}), dry_run=True, kinds=("posts",),
+    )
+    assert outcomes == {"200": "skipped"}
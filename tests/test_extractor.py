@@ -0,0 +1,32 @@
+import pytest
+
+from extractor import classify_reply, parse_count
+
+@pytest.mark.parametrize("text, expected", [
+    ("", 0),
+    ("0", 0),
+    ("12", 12),
+    ("1,234", 1234),
+    ("1K", 1999),
+    ("1.2K", 1299),
+    ("12.5K", 12599),
+    ("3M", 3999999),
+    ("1.25M", 1259999),
+])
+def test_parse_count_reads_abbreviations_as_upper_bounds(text, expected):
+    assert parse_count(text) == expected
+
+@pytest.mark.parametrize("text", ["abc", "1.5", "1.2X"])
+def test_parse_count_unparseable(text):
+    assert parse_count(text) is None
+
+def test_abbreviated_count_never_passes_a_limit_it_may_exceed():
+    # 1,050 likes show as "1K"
+    assert parse_count("1K") > 1000
+
+def test_classify_reply():
+    article = {"is_reply": False, "above_href": "https://x.com/someone/status/1"}
+    assert classify_reply(article, "me")
+    assert not classify_reply({"is_reply": False, "above_href": "https://x.com/Me/status/1"}, "me")
+    assert not classify_reply({"is_reply": False, "above_href": None}, "me")
+    assert classify_reply({"is_reply": True, "above_href": None}, "me")
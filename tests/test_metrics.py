@@ -0,0 +1,42 @@
+import threading
+
+from metrics import RunMetrics
+
+class Executor:
+    def execute(self, command, params):
+        return {}
+
+class Driver:
+    def __init__(self):
+        self.command_executor = Executor()
+
+def test_item_counts_the_calling_threads_commands_over_every_browser():
+    scanner, worker = Driver(), Driver()
+    metrics = RunMetrics()
+    metrics.attach(scanner)
+    metrics.attach(worker, "worker")
+
+    def delete_one():
+        with metrics.item():
+            for _ in range(3):
+                worker.command_executor.execute("click", {})
+            scanner.command_executor.execute("script", {}) # Not usual, but still this item's command
+
+    for _ in range(5):
+        scanner.command_executor.execute("script", {}) # The scan, running alongside
+    thread = threading.Thread(target=delete_one)
+    thread.start()
+    thread.join()
+
+    report = metrics.report()
+    assert report["commands_per_item"]["sum"] == 4
+    assert report["webdriver_commands"] == 9
+    assert report["webdriver_commands_by_browser"] == {"main": 6, "worker": 3}
+
+def test_detach_restores_the_executors():
+    driver = Driver()
+    original = driver.command_executor.execute
+    metrics = RunMetrics()
+    metrics.attach(driver)
+    metrics.detach()
+    assert driver.command_executor.execute == original
@@ -0,0 +1,31 @@
+import time
+
+from pacing import BACKOFF_FLOOR, PacingController
+
+def test_full_speed_until_something_is_signalled():
+    pacer = PacingController()
+    for _ in range(10):
+        assert pacer.record(True) is False
+    assert pacer.interval == 0.0
+
+def test_rate_limit_backs_off_and_waits_out_the_reset():
+    pacer = PacingController()
+    assert pacer.record(False, {"rate_limited": True, "status": 429, "reset_in": 60}) is True
+    assert pacer.interval == BACKOFF_FLOOR
+    assert pacer.rate_limited == 1
+    assert pacer.next_at - time.monotonic() > 50 # Paused for the reset, not just the interval
+
+def test_failure_rate_backs_off_and_successes_ramp_back_down():
+    pacer = PacingController()
+    for _ in range(5):
+        pacer.record(False)
+    slowed = pacer.interval
+    assert slowed >= BACKOFF_FLOOR
+    for _ in range(pacer.ramp_after):
+        pacer.record(True)
+    assert pacer.interval < slowed
+
+def test_low_budget_is_spread_over_the_window():
+    pacer = PacingController()
+    pacer.record(True, {"remaining": 10, "reset_in": 100})
+    assert pacer.interval == 10
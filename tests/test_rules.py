@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from checkpoint import TWEETS
+from rules import compile_rules
+
+NOW = datetime(2026, 6, 1, 12, tzinfo=timezone.utc)
+
+def article(**fields):
+    base = {"is_reply": False, "replies": 0, "reposts": 0, "likes": 0, "timestamp": "2024-01-01T00:00:00.000Z", "text": ""}
+    base.update(fields)
+    return base
+
+def test_default_rules_use_the_shared_scope():
+    assert compile_rules().scope == TWEETS
+
+def test_scope_is_stable_across_days():
+    spec = {"older_than_days": 30, "max_likes": 2}
+    today = compile_rules(spec, now=NOW)
+    tomorrow = compile_rules(spec, now=NOW.replace(day=2))
+    assert today.before != tomorrow.before
+    assert today.scope == tomorrow.scope
+
+def test_scope_differs_per_spec():
+    assert compile_rules({"max_likes": 2}).scope != compile_rules({"max_likes": 3}).scope
+
+def test_unset_criteria_match_everything():
+    rules = compile_rules({})
+    assert rules.check(article(likes=500)) is True
+
+def test_unreadable_count_is_undecided():
+    rules = compile_rules({"max_likes": 0})
+    assert rules.check(article(likes=None)) is None
+    assert rules.check(article(likes=None, replies=3)) is None # max_replies isn't set
+    assert compile_rules().check(article(likes=None, replies=3)) is False # A definite miss wins
+
+def test_too_young():
+    rules = compile_rules({"older_than_days": 30}, now=NOW)
+    assert rules.too_young(article(timestamp="2026-05-20T00:00:00.000Z"))
+    assert not rules.too_young(article(timestamp="2026-01-01T00:00:00.000Z"))
+    assert rules.check(article(timestamp="2026-05-20T00:00:00.000Z")) is False
+
+def test_invalid_specs():
+    with pytest.raises(ValueError):
+        compile_rules({"max_likes": -1})
+    with pytest.raises(ValueError):
+        compile_rules({"text_regex": "("})
+    with pytest.raises(ValueError):
+        compile_rules({"older_than_days": 30, "newer_than_days": 10})
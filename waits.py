@@ -0,0 +1,59 @@
+# Event-driven waits: each helper returns as soon as the DOM condition it is
+# waiting for holds, with the timeout as a ceiling instead of a fixed sleep.
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+POLL_INTERVAL = 0.1
+
+# Permalink of the last article currently in the timeline, used to notice appends
+LAST_ARTICLE_KEY_JS = r"""
+const articles = document.querySelectorAll('article[data-testid="tweet"]');
+if (!articles.length) return null;
+const last = articles[articles.length - 1];
+const time = last.querySelector('a[href*="/status/"] time');
+return (time && time.closest('a') ? time.closest('a').href : '') + '#' + articles.length;
+"""
+
+UNLIKE_SETTLED_JS = r"""
+const btn = arguments[0];
+return !btn.isConnected || btn.getAttribute('data-testid') === 'like';
+"""
+
+def wait_until(driver, condition, timeout):
+    # condition(driver) -> truthy value; returns it, or None once the timeout ceiling is hit
+    try:
+        return WebDriverWait(
+            driver, timeout, poll_frequency=POLL_INTERVAL,
+            ignored_exceptions=(StaleElementReferenceException,),
+        ).until(condition)
+    except TimeoutException:
+        return None
+
+def wait_for_element(driver, xpath, timeout=10):
+    return wait_until(driver, EC.presence_of_element_located((By.XPATH, xpath)), timeout)
+
+def wait_for_gone(driver, xpath, timeout=10):
+    return bool(wait_until(driver, EC.invisibility_of_element_located((By.XPATH, xpath)), timeout))
+
+def wait_for_staleness(driver, element, timeout=10):
+    return bool(wait_until(driver, EC.staleness_of(element), timeout))
+
+def wait_for_unlike_flip(driver, unlike_button, timeout=5):
+    # X swaps data-testid="unlike" to "like" on the same button (or drops the article) once the unlike lands
+    return bool(wait_until(driver, lambda d: d.execute_script(UNLIKE_SETTLED_JS, unlike_button), timeout))
+
+def close_open_menu(driver, timeout=3):
+    driver.execute_script("document.body.click();")
+    return wait_for_gone(driver, '//div[@role="menu"]', timeout)
+
+def last_article_key(driver):
+    return driver.execute_script(LAST_ARTICLE_KEY_JS)
+
+def scroll_and_wait_for_new_articles(driver, timeout=8):
+    # Scroll to the bottom and wait until the timeline appends (or recycles in) a new last article.
+    # Returns False if nothing new arrived before the timeout, i.e. probably the end of the timeline.
+    before = last_article_key(driver)
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    return bool(wait_until(driver, lambda d: last_article_key(d) != before, timeout))